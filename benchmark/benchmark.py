@@ -0,0 +1,231 @@
+import json
+import os
+import random
+import sys
+import time
+from typing import Callable
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from cache_policy import get_cache_policy
+from clock import TICKS_PER_MINUTE, TICKS_PER_SECOND, VirtualClock
+from config import global_config, load_config
+from container_cache import ContainerCache
+from controller import CacheAwareController, get_controller
+from dataset.synthetic_workload import SyntheticWorkload
+from invoker import CacheInvoker, Invoker
+from job_scheduler import LotterySRTFScheduler
+from simulated_concept import Container, Invocation
+
+scheduler_names = ["FIFO", "RR", "LAS", "SRTF", "LotterySRTF"]
+cache_policy_names = ["LRU", "GDSF", "KeepAlive", "HistogramKeepAlive"]
+controller_names = ["leastload", "cacheaware"]
+baseline_path = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+
+class BenchmarkWorkload(SyntheticWorkload):
+    def __init__(self, application_number: int, arrivals_per_second: int = 0):
+        # the applications come from the workload parameter file, the invocation
+        # limit spreads arrivals_per_second evenly over the functions
+        global_config["application_number"] = application_number
+        if arrivals_per_second:
+            global_config["application_invocation_limit"] = 60 * arrivals_per_second
+        super().__init__()
+
+    def sample_invocations(self, number: int, clock: VirtualClock) -> list[Invocation]:
+        invocations = []
+        for _ in range(number):
+            app = random.choice(self.applications)
+            invocation = Invocation(fun=random.choice(app.functions), app=app)
+            invocation.invoke_time = clock.ticks
+            invocations.append(invocation)
+        return invocations
+
+
+def benchmark_scheduler(name: str, job_number: int, invoker_number: int) -> float:
+    # jobs completed per second by invokers that start with job_number jobs each
+    global_config["scheduler_type"] = name
+    LotterySRTFScheduler.known_job_IDs.clear()
+    workload = BenchmarkWorkload(application_number=20)
+    clock = VirtualClock()
+    invokers = []
+    for _ in range(invoker_number):
+        invokers.append(Invoker(memory=2**40, cores=global_config["invoker"]["core"]))
+        for invocation in workload.sample_invocations(number=job_number, clock=clock):
+            invokers[-1].add_new_job(invocation=invocation, clock=clock)
+    start = time.perf_counter()
+    for invoker in invokers:
+        invoker.run(time_duration=2**62)
+    return job_number * invoker_number / (time.perf_counter() - start)
+
+
+def benchmark_cache_policy(
+    name: str, container_number: int, cache_number: int
+) -> float:
+    # containers evicted per second, one container per eviction request
+    workload = BenchmarkWorkload(application_number=200)
+    evicted_number = 0
+    evict_time = 0.0
+    for _ in range(cache_number):
+        cache_policy = get_cache_policy(name=name)
+        cache = ContainerCache()
+        clock = VirtualClock()
+        for invocation in workload.sample_invocations(
+            number=container_number, clock=clock
+        ):
+            container = Container(invocation=invocation, clock=clock)
+            invocation.finish(clock.ticks + invocation.fun.exec_time)
+            cache_policy.add_to_cache(cache=cache, container=container)
+            clock.advance(TICKS_PER_SECOND // 100)
+        start = time.perf_counter()
+        while cache:
+            evicted_number += len(
+                cache_policy.evict(cache, lambda released_memory: released_memory > 0)
+            )
+        evict_time += time.perf_counter() - start
+    return evicted_number / evict_time
+
+
+def benchmark_controller(
+    name: str, invoker_number: int, simulated_seconds: int
+) -> float:
+    # invocations routed per second of routing time, the invokers run between
+    # the seconds like in the tick engine, about one arrival per invoker and second
+    global_config["controller_type"] = name
+    controller = get_controller(name)
+    invoker_cls = (
+        CacheInvoker if isinstance(controller, CacheAwareController) else Invoker
+    )
+    invokers = [
+        invoker_cls(
+            memory=global_config["invoker"]["memory"] * 1024,
+            cores=global_config["invoker"]["core"],
+        )
+        for _ in range(invoker_number)
+    ]
+    controller.register_invokers(invokers=invokers)
+    workload = BenchmarkWorkload(
+        application_number=max(20, invoker_number // 5),
+        arrivals_per_second=invoker_number,
+    )
+    clock = VirtualClock()
+    routed_number = 0
+    route_time = 0.0
+    simulation_minutes = -(-simulated_seconds * TICKS_PER_SECOND // TICKS_PER_MINUTE)
+    for batch in workload.stream_arrivals(simulation_minutes=simulation_minutes):
+        if batch.arrival_times[-1] >= simulated_seconds * TICKS_PER_SECOND:
+            break
+        while clock.ticks < batch.arrival_times[-1]:
+            for invoker in invokers:
+                invoker.run(time_duration=TICKS_PER_SECOND)
+            clock.advance(TICKS_PER_SECOND)
+            for invoker in invokers:
+                invoker.sync_local_clock(global_clock=clock)
+        start = time.perf_counter()
+        routed_number += controller.route_batch(
+            invocations=batch, invokers=invokers, clock=clock
+        )
+        route_time += time.perf_counter() - start
+    return routed_number / route_time
+
+
+def __best_of(repeat: int, seed: int, fun: Callable[[], float]) -> float:
+    # every repetition does the same work, the fastest one has the least noise
+    results = []
+    for _ in range(repeat):
+        random.seed(seed)
+        np.random.seed(seed)
+        results.append(fun())
+    return round(max(results), 1)
+
+
+def run_benchmark(benchmark_config: dict) -> dict:
+    repeat = benchmark_config.get("repeat", 3)
+    seed = benchmark_config.get("seed", 0)
+    # the work of a measurement grows with the size, small sizes are repeated
+    # until min_items are processed
+    min_items = benchmark_config.get("min_items", 10000)
+    results: dict = {"scheduler": {}, "cache_policy": {}, "controller": {}}
+    for name in scheduler_names:
+        results["scheduler"][name] = {
+            str(job_number): __best_of(
+                repeat,
+                seed,
+                lambda: benchmark_scheduler(
+                    name=name,
+                    job_number=job_number,
+                    invoker_number=-(-min_items // job_number),
+                ),
+            )
+            for job_number in benchmark_config["job_numbers"]
+        }
+        print("scheduler", name, results["scheduler"][name])
+    for name in cache_policy_names:
+        results["cache_policy"][name] = {
+            str(container_number): __best_of(
+                repeat,
+                seed,
+                lambda: benchmark_cache_policy(
+                    name=name,
+                    container_number=container_number,
+                    cache_number=-(-min_items // container_number),
+                ),
+            )
+            for container_number in benchmark_config["container_numbers"]
+        }
+        print("cache_policy", name, results["cache_policy"][name])
+    for name in controller_names:
+        results["controller"][name] = {
+            str(invoker_number): __best_of(
+                repeat,
+                seed,
+                lambda: benchmark_controller(
+                    name=name,
+                    invoker_number=invoker_number,
+                    simulated_seconds=max(
+                        benchmark_config["simulated_seconds"],
+                        -(-min_items // invoker_number),
+                    ),
+                ),
+            )
+            for invoker_number in benchmark_config["invoker_numbers"]
+        }
+        print("controller", name, results["controller"][name])
+    return results
+
+
+def compare_with_baseline(results: dict, baseline: dict) -> None:
+    # throughput relative to the baseline, below 1 is a slowdown
+    for component, names in results.items():
+        for name, sizes in names.items():
+            for size, throughput in sizes.items():
+                base = baseline.get(component, {}).get(name, {}).get(size, None)
+                if base is None:
+                    print(component, name, size, throughput, "no baseline")
+                    continue
+                print(
+                    component,
+                    name,
+                    size,
+                    throughput,
+                    "baseline",
+                    base,
+                    "ratio",
+                    round(throughput / base, 3),
+                )
+
+
+if __name__ == "__main__":
+    load_config()
+    benchmark_config = global_config["benchmark"]
+    results = run_benchmark(benchmark_config)
+    if benchmark_config.get("save_baseline", False):
+        with open(baseline_path, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print("save baseline to", baseline_path)
+    elif os.path.isfile(baseline_path):
+        with open(baseline_path, encoding="utf-8") as f:
+            compare_with_baseline(results, json.load(f))
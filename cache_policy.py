@@ -1,72 +1,196 @@
 import heapq
+from datetime import timedelta
 from typing import Callable
 
+from clock import TICKS_PER_MINUTE, TICKS_PER_SECOND, VirtualClock, to_ticks
+from config import global_config
+from container_cache import ContainerCache
 from simulated_concept import Container
+from timer_wheel import TimerWheel
 
 
 class CachePolicy:
-    def add_to_cache(self, cache: list[Container], container: Container):
+    def add_to_cache(self, cache: ContainerCache, container: Container):
         raise NotImplementedError()
 
-    def evict(
-        self, cache: list[Container], stop_criteria: Callable, new_container=None
-    ) -> list[Container]:
+    def reuse_container(
+        self, cache: ContainerCache, container: Container, clock: VirtualClock
+    ) -> None:
+        cache.remove(container)
+
+    def evict(self, cache: ContainerCache, stop_criteria: Callable) -> list[Container]:
         raise NotImplementedError()
 
+    def expire(self, cache: ContainerCache, clock: VirtualClock) -> list[Container]:
+        return []
 
-class LRUCachePolicy(CachePolicy):
-    def add_to_cache(self, cache: list[Container], container: Container):
-        cache.append(container)
+    def next_expiration(self) -> int | None:
+        return None
 
-    def evict(
-        self, cache: list[Container], stop_criteria: Callable, new_container=None
-    ) -> list[Container]:
-        assert cache
-        containers = [(container.reuse_time, container) for container in cache]
-        released_memory = 0
-        heapq.heapify(containers)
-        while containers and not stop_criteria(released_memory):
-            container = heapq.heappop(containers)
-            released_memory += container[1].memory
-        return [container[1] for container in containers]
 
+class PriorityCachePolicy(CachePolicy):
+    def __init__(self):
+        # (priority, container id, use count, container), the use count tells apart
+        # entries left behind by containers that were reused since
+        self.__heap: list[tuple] = []
+
+    def _priority(self, container: Container) -> float:
+        raise NotImplementedError()
 
-class GDSFCachePolicy(CachePolicy):
-    clock = 0
+    def _on_evict(self, priority: float) -> None:
+        pass
 
-    def add_to_cache(self, cache: list[Container], container: Container):
-        container.set_data("GDSF_clock", GDSFCachePolicy.clock)
-        cache.append(container)
+    def add_to_cache(self, cache: ContainerCache, container: Container):
+        cache.add(container)
+        heapq.heappush(
+            self.__heap,
+            (self._priority(container), container.id, container.use_count, container),
+        )
+        if len(self.__heap) > 2 * len(cache) + 64:
+            self.__heap = [
+                entry for entry in self.__heap if self.__is_cached(cache, entry)
+            ]
+            heapq.heapify(self.__heap)
 
-    def evict(
-        self, cache: list[Container], stop_criteria: Callable, new_container=None
-    ) -> list[Container]:
+    def evict(self, cache: ContainerCache, stop_criteria: Callable) -> list[Container]:
         assert cache
-        containers = [
-            (
-                container.get_data("GDSF_clock")
-                + container.use_count
-                * container.invocation.fun.container_init_time
-                / container.memory,
-                container,
-            )
-            for container in cache
-        ]
         released_memory = 0
-        max_clock = 0
-        heapq.heapify(containers)
-        removed_containers = []
-        while containers and not stop_criteria(released_memory):
-            container = heapq.heappop(containers)
-            released_memory += container[1].memory
-            max_clock = max(max_clock, container[0])
-            if container[1] != new_container:
-                removed_containers.append(container[1])
-            else:
-                return [container[1] for container in containers] + removed_containers
-        assert max_clock >= GDSFCachePolicy.clock
-        GDSFCachePolicy.clock = max_clock
-        return [container[1] for container in containers]
+        evicted_containers: list[Container] = []
+        while self.__heap and not stop_criteria(released_memory):
+            entry = heapq.heappop(self.__heap)
+            if not self.__is_cached(cache, entry):
+                continue
+            container = entry[3]
+            cache.remove(container)
+            released_memory += container.memory
+            evicted_containers.append(container)
+            self._on_evict(entry[0])
+        return evicted_containers
+
+    @classmethod
+    def __is_cached(cls, cache: ContainerCache, entry: tuple) -> bool:
+        container = entry[3]
+        return container in cache and container.use_count == entry[2]
+
+
+class LRUCachePolicy(PriorityCachePolicy):
+    def _priority(self, container: Container) -> float:
+        return container.reuse_time
+
+
+class GDSFCachePolicy(PriorityCachePolicy):
+    def __init__(self):
+        super().__init__()
+        self.__clock: float = 0
+
+    def _priority(self, container: Container) -> float:
+        return (
+            self.__clock
+            + container.use_count
+            * container.invocation.fun.container_init_time
+            / container.memory
+        )
+
+    def _on_evict(self, priority: float) -> None:
+        assert priority >= self.__clock
+        self.__clock = priority
+
+
+class KeepAliveCachePolicy(LRUCachePolicy):
+    def __init__(self, keep_alive: int):
+        # idle containers expire after the keep-alive window,
+        # memory pressure still evicts them in LRU order
+        super().__init__()
+        self.__keep_alive = keep_alive
+        self.__timer_wheel = TimerWheel(resolution=TICKS_PER_SECOND)
+        self.__timed_containers: dict[int, Container] = {}
+
+    def _keep_alive_window(self, container: Container) -> int:
+        return self.__keep_alive
+
+    def add_to_cache(self, cache: ContainerCache, container: Container):
+        super().add_to_cache(cache=cache, container=container)
+        self.__timed_containers[container.id] = container
+        self.__timer_wheel.schedule(
+            key=container.id,
+            deadline=container.invocation.finish_time
+            + self._keep_alive_window(container),
+        )
+
+    def reuse_container(
+        self, cache: ContainerCache, container: Container, clock: VirtualClock
+    ) -> None:
+        self.__cancel_timer(container)
+        super().reuse_container(cache=cache, container=container, clock=clock)
+
+    def evict(self, cache: ContainerCache, stop_criteria: Callable) -> list[Container]:
+        evicted_containers = super().evict(cache=cache, stop_criteria=stop_criteria)
+        for container in evicted_containers:
+            self.__cancel_timer(container)
+        return evicted_containers
+
+    def expire(self, cache: ContainerCache, clock: VirtualClock) -> list[Container]:
+        expired_containers: list[Container] = []
+        for container_id in self.__timer_wheel.advance(clock.ticks):
+            container = self.__timed_containers.pop(container_id)
+            cache.remove(container)
+            expired_containers.append(container)
+        return expired_containers
+
+    def __cancel_timer(self, container: Container) -> None:
+        # every cached container has a timer, cancelled when it leaves the cache
+        self.__timer_wheel.cancel(container.id)
+        self.__timed_containers.pop(container.id)
+
+    def next_expiration(self) -> int | None:
+        return self.__timer_wheel.next_deadline()
+
+
+class HistogramKeepAliveCachePolicy(KeepAliveCachePolicy):
+    bin_width: int = TICKS_PER_MINUTE
+    bin_number: int = 240
+    min_sample_number: int = 10
+    percentile: float = 0.99
+    margin: float = 0.1
+
+    def __init__(self, keep_alive: int):
+        # the window of an application follows the tail of its idle time histogram,
+        # the fixed window is used until enough idle times are observed
+        super().__init__(keep_alive=keep_alive)
+        self.__histograms: dict[int, list[int]] = {}
+        self.__windows: dict[int, int] = {}
+
+    def reuse_container(
+        self, cache: ContainerCache, container: Container, clock: VirtualClock
+    ) -> None:
+        idle_time = clock.ticks - container.invocation.finish_time
+        app_id = container.app_id
+        if app_id not in self.__histograms:
+            self.__histograms[app_id] = [0] * self.bin_number
+        self.__histograms[app_id][
+            min(idle_time // self.bin_width, self.bin_number - 1)
+        ] += 1
+        self.__windows.pop(app_id, None)
+        super().reuse_container(cache=cache, container=container, clock=clock)
+
+    def _keep_alive_window(self, container: Container) -> int:
+        app_id = container.app_id
+        window = self.__windows.get(app_id)
+        if window is not None:
+            return window
+        histogram = self.__histograms.get(app_id)
+        sample_number = 0 if histogram is None else sum(histogram)
+        if sample_number < self.min_sample_number:
+            return super()._keep_alive_window(container)
+        threshold = self.percentile * sample_number
+        count = 0
+        for bin_idx, bin_count in enumerate(histogram):
+            count += bin_count
+            if count >= threshold:
+                break
+        window = int((bin_idx + 1) * self.bin_width * (1 + self.margin))
+        self.__windows[app_id] = window
+        return window
 
 
 def get_cache_policy(name: str) -> CachePolicy:
@@ -75,4 +199,16 @@ def get_cache_policy(name: str) -> CachePolicy:
             return LRUCachePolicy()
         case "GDSF":
             return GDSFCachePolicy()
+        case "KeepAlive":
+            return KeepAliveCachePolicy(
+                keep_alive=to_ticks(
+                    timedelta(minutes=global_config.get("keep_alive_minutes", 10))
+                )
+            )
+        case "HistogramKeepAlive":
+            return HistogramKeepAliveCachePolicy(
+                keep_alive=to_ticks(
+                    timedelta(minutes=global_config.get("keep_alive_minutes", 10))
+                )
+            )
     raise NotImplementedError()
@@ -1,25 +1,43 @@
 from datetime import timedelta
 
+# simulated time is counted in integer ticks of one microsecond
+TICKS_PER_SECOND = 1_000_000
+TICKS_PER_MINUTE = 60 * TICKS_PER_SECOND
+
+
+def to_ticks(duration: timedelta) -> int:
+    return duration // timedelta(microseconds=1)
+
+
+def to_timedelta(ticks: int) -> timedelta:
+    return timedelta(microseconds=ticks)
+
 
 class VirtualClock:
     def __init__(self):
-        self.__time_point: timedelta = timedelta()
+        self.__ticks: int = 0
         self.reset()
 
     def __repr__(self) -> str:
         return f"{self.time_point}"
 
     def reset(self) -> None:
-        self.__time_point = timedelta()
+        self.__ticks = 0
 
     @property
     def elapsed_minutes(self) -> int:
-        return int(self.time_point / timedelta(minutes=1))
+        return self.__ticks // TICKS_PER_MINUTE
+
+    @property
+    def ticks(self) -> int:
+        return self.__ticks
 
     @property
     def time_point(self) -> timedelta:
-        time_point: timedelta = self.__time_point
-        return time_point
+        return to_timedelta(self.__ticks)
+
+    def set_ticks(self, ticks: int) -> None:
+        self.__ticks = ticks
 
-    def advance(self, amount: timedelta) -> None:
-        self.__time_point += amount
+    def advance(self, amount: int) -> None:
+        self.__ticks += amount
@@ -0,0 +1,74 @@
+import numpy as np
+
+
+class ClusterState:
+    def __init__(self, invokers: list):
+        stats = [invoker.get_performance_stat() for invoker in invokers]
+        self.free_memory = np.asarray(
+            [stat["free_memory"] for stat in stats], dtype=np.int64
+        )
+        self.job_numbers = np.asarray(
+            [stat["job_number"] for stat in stats], dtype=np.int64
+        )
+        self.cores = np.asarray([stat["cores"] for stat in stats], dtype=np.int64)
+        self.cached_memory = np.asarray(
+            [stat.get("cached_memory", 0) for stat in stats], dtype=np.int64
+        )
+        # warm container directory: which invokers cache a function or application
+        self.cached_containers = np.zeros(len(invokers), dtype=np.int64)
+        self.warm_functions: dict[int, set[int]] = {}
+        self.warm_applications: dict[int, set[int]] = {}
+        for index, invoker in enumerate(invokers):
+            invoker.set_cluster_state(cluster_state=self, index=index)
+
+    @property
+    def loads(self) -> np.ndarray:
+        return self.job_numbers / self.cores
+
+    @property
+    def headroom(self) -> np.ndarray:
+        # memory usable without evicting any cached container
+        return self.free_memory - self.cached_memory
+
+    def add_job(self, index: int, memory: int) -> None:
+        self.free_memory[index] -= memory
+        self.job_numbers[index] += 1
+
+    def finish_job(self, index: int, memory: int) -> None:
+        self.free_memory[index] += memory
+        self.job_numbers[index] -= 1
+
+    def add_cached_container(
+        self,
+        index: int,
+        memory: int,
+        fun_id: int | None = None,
+        app_id: int | None = None,
+    ) -> None:
+        self.cached_containers[index] += 1
+        self.cached_memory[index] += memory
+        if fun_id is not None:
+            self.warm_functions.setdefault(fun_id, set()).add(index)
+        if app_id is not None:
+            self.warm_applications.setdefault(app_id, set()).add(index)
+
+    def remove_cached_container(
+        self,
+        index: int,
+        memory: int,
+        fun_id: int | None = None,
+        app_id: int | None = None,
+    ) -> None:
+        self.cached_containers[index] -= 1
+        self.cached_memory[index] -= memory
+        if fun_id is not None:
+            self.__discard(self.warm_functions, fun_id, index)
+        if app_id is not None:
+            self.__discard(self.warm_applications, app_id, index)
+
+    @classmethod
+    def __discard(cls, directory: dict[int, set[int]], key: int, index: int) -> None:
+        indices = directory[key]
+        indices.discard(index)
+        if not indices:
+            directory.pop(key)
@@ -0,0 +1,123 @@
+import bisect
+from typing import Iterator
+
+from simulated_concept import Container, Invocation
+
+
+class ContainerCache:
+    def __init__(self):
+        self.__containers: dict[int, Container] = {}
+        self.__functions: dict[int, dict[int, Container]] = {}
+        self.__applications: dict[int, dict[int, Container]] = {}
+        # containers grouped by memory size and the sorted distinct sizes for
+        # best-fit lookups, a size is inserted into or deleted from the list in
+        # O(sizes) only when its group is created or emptied
+        self.__memory_groups: dict[int, dict[int, Container]] = {}
+        self.__memory_sizes: list[int] = []
+        self.__memory: int = 0
+        self.__cluster_state = None
+        self.__cluster_index: int = 0
+
+    def __len__(self) -> int:
+        return len(self.__containers)
+
+    def __iter__(self) -> Iterator[Container]:
+        return iter(self.__containers.values())
+
+    def __contains__(self, container: Container) -> bool:
+        return container.id in self.__containers
+
+    def __repr__(self) -> str:
+        return f"{list(self.__containers.values())}"
+
+    @property
+    def memory(self) -> int:
+        return self.__memory
+
+    def set_cluster_state(self, cluster_state, index: int) -> None:
+        # report which functions and applications become warm on this invoker
+        assert not self.__containers
+        self.__cluster_state = cluster_state
+        self.__cluster_index = index
+
+    def add(self, container: Container) -> None:
+        container_id = container.id
+        assert container_id not in self.__containers
+        self.__containers[container_id] = container
+        new_function = self.__add_to_group(
+            self.__functions, container.fun_id, container
+        )
+        new_application = self.__add_to_group(
+            self.__applications, container.app_id, container
+        )
+        if self.__add_to_group(self.__memory_groups, container.memory, container):
+            bisect.insort(self.__memory_sizes, container.memory)
+        self.__memory += container.memory
+        if self.__cluster_state is not None:
+            self.__cluster_state.add_cached_container(
+                index=self.__cluster_index,
+                memory=container.memory,
+                fun_id=container.fun_id if new_function else None,
+                app_id=container.app_id if new_application else None,
+            )
+
+    def remove(self, container: Container) -> None:
+        container_id = container.id
+        self.__containers.pop(container_id)
+        last_function = self.__remove_from_group(
+            self.__functions, container.fun_id, container_id
+        )
+        last_application = self.__remove_from_group(
+            self.__applications, container.app_id, container_id
+        )
+        if self.__remove_from_group(
+            self.__memory_groups, container.memory, container_id
+        ):
+            del self.__memory_sizes[
+                bisect.bisect_left(self.__memory_sizes, container.memory)
+            ]
+        self.__memory -= container.memory
+        if self.__cluster_state is not None:
+            self.__cluster_state.remove_cached_container(
+                index=self.__cluster_index,
+                memory=container.memory,
+                fun_id=container.fun_id if last_function else None,
+                app_id=container.app_id if last_application else None,
+            )
+
+    def lookup(self, invocation: Invocation) -> tuple[Container | None, int]:
+        # prefer a container of the same function, then of the same application,
+        # then the smallest container large enough for the invocation
+        group = self.__functions.get(invocation.fun.id)
+        if group:
+            return next(iter(group.values())), 0
+        group = self.__applications.get(invocation.app.id)
+        if group:
+            return next(iter(group.values())), 1
+        idx = bisect.bisect_left(self.__memory_sizes, invocation.memory)
+        if idx < len(self.__memory_sizes):
+            group = self.__memory_groups[self.__memory_sizes[idx]]
+            return next(iter(group.values())), 2
+        return None, 3
+
+    @classmethod
+    def __add_to_group(
+        cls, groups: dict[int, dict[int, Container]], key: int, container: Container
+    ) -> bool:
+        group = groups.get(key)
+        if group is None:
+            groups[key] = {container.id: container}
+            return True
+        group[container.id] = container
+        return False
+
+    @classmethod
+    def __remove_from_group(
+        cls, groups: dict[int, dict[int, Container]], key: int, container_id: int
+    ) -> bool:
+        group = groups[key]
+        group.pop(container_id)
+        if not group:
+            groups.pop(key)
+            return True
+        return False
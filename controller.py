@@ -1,25 +1,26 @@
-from typing import Any
+import heapq
+from typing import Iterable
 
 import numpy as np
 
 from clock import VirtualClock
-from invoker import CacheInvoker, Invoker
-from simulated_concept import Invocation
+from cluster_state import ClusterState
+from invocation_batch import InvocationBatch, InvocationQueue
+from invoker import Invoker
+from simulated_concept import Container, Invocation
 
 
 class Controller:
     def __init__(self):
-        self._invoker_stat = []
-        self._queue: list[Invocation] = []
-        self.__free_memory = None
-        self._job_numbers = None
-        self._cores = None
+        self._queue = InvocationQueue()
+        self._cluster_state: ClusterState | None = None
+        # dispatches per cache level since the last telemetry sample
+        self._dispatch_counts: list[int] = [0] * 4
 
     def _check_memory(self):
         if not self.has_invocation():
             return None
-        invocation = self._queue[0]
-        mask = self.__free_memory >= invocation.app.memory
+        mask = self._cluster_state.free_memory >= self._queue.peek_memory()
         if not np.any(mask):
             return None
         return mask
@@ -27,28 +28,66 @@ class Controller:
     def has_invocation(self) -> bool:
         return bool(self._queue)
 
+    @property
+    def queue_length(self) -> int:
+        return len(self._queue)
+
+    @property
+    def cluster_state(self) -> ClusterState | None:
+        return self._cluster_state
+
+    def take_dispatch_counts(self) -> list[int]:
+        dispatch_counts = self._dispatch_counts
+        self._dispatch_counts = [0] * 4
+        return dispatch_counts
+
     def queue_invocation(self, invocation: Invocation):
         self._queue.append(invocation)
 
-    def collect_invoker_stat(self, invokers: list[Invoker]) -> None:
-        self._invoker_stat = [i.get_performance_stat() for i in invokers]
-        self.__free_memory = np.asarray(
-            [stat["free_memory"] for stat in self._invoker_stat]
-        )
-        self._job_numbers = np.asarray(
-            [stat["job_number"] for stat in self._invoker_stat]
-        )
-        self._cores = np.asarray([stat["cores"] for stat in self._invoker_stat])
+    def register_invokers(self, invokers: list[Invoker]) -> None:
+        # invokers push their job and memory deltas into the shared arrays
+        self._cluster_state = ClusterState(invokers=invokers)
+
+    def route_batch(
+        self,
+        invocations: InvocationBatch | Iterable[Invocation],
+        invokers: list[Invoker],
+        clock: VirtualClock,
+    ) -> int:
+        self._queue.extend(invocations)
+        routed_number = 0
+        while self.route_invocation(invokers=invokers, clock=clock):
+            routed_number += 1
+        return routed_number
 
     def route_invocation(self, invokers: list[Invoker], clock: VirtualClock) -> bool:
-        self.collect_invoker_stat(invokers=invokers)
+        assert self._cluster_state is not None
         mask = self._check_memory()
         if mask is None:
             return False
-        invocation = self._queue.pop(0)
-        index, cache_idx, cache_level = self.decide_invoker(
-            mask=mask, invokers=invokers, invocation=invocation
+        invocation = self._queue.popleft()
+        index, cached_container, cache_level = self.decide_invoker(
+            mask=mask, invokers=invokers, invocation=invocation, clock=clock
         )
+        self._dispatch(
+            invocation=invocation,
+            index=index,
+            cached_container=cached_container,
+            cache_level=cache_level,
+            invokers=invokers,
+            clock=clock,
+        )
+        return True
+
+    def _dispatch(
+        self,
+        invocation: Invocation,
+        index: int,
+        cached_container: None | Container,
+        cache_level: int,
+        invokers: list[Invoker],
+        clock: VirtualClock,
+    ) -> None:
         match cache_level:
             case 0:
                 invocation.set_exec_time(invocation.fun.exec_time)
@@ -64,66 +103,139 @@ class Controller:
                 )
             case 3:
                 invocation.set_exec_time(invocation.fun.total_cost)
-        self.__free_memory[index] -= invocation.app.memory
+        invocation.cache_level = cache_level
+        self._dispatch_counts[cache_level] += 1
         invokers[index].add_new_job(
-            invocation=invocation, clock=clock, cache_idx=cache_idx
+            invocation=invocation, clock=clock, cached_container=cached_container
         )
-        self._job_numbers[index] += 1
-        return True
 
     def decide_invoker(
-        self, mask, invokers: list[Invoker], invocation: Invocation
-    ) -> tuple[int, None | int]:
+        self,
+        mask,
+        invokers: list[Invoker],
+        invocation: Invocation,
+        clock: VirtualClock,
+    ) -> tuple[int, None | Container, int]:
         raise NotImplementedError()
 
 
 class LeastLoadController(Controller):
+    def route_batch(
+        self,
+        invocations: InvocationBatch | Iterable[Invocation],
+        invokers: list[Invoker],
+        clock: VirtualClock,
+    ) -> int:
+        assert self._cluster_state is not None
+        self._queue.extend(invocations)
+        if not self._queue:
+            return 0
+        free_memory = self._cluster_state.free_memory.tolist()
+        job_numbers = self._cluster_state.job_numbers.tolist()
+        cores = self._cluster_state.cores.tolist()
+        # ties go to the lowest index, the same choice as np.argmin
+        load_heap = [
+            (job_number / core, idx)
+            for idx, (job_number, core) in enumerate(zip(job_numbers, cores))
+        ]
+        heapq.heapify(load_heap)
+        routed_number = 0
+        while self._queue:
+            memory = self._queue.peek_memory()
+            skipped = []
+            while load_heap and free_memory[load_heap[0][1]] < memory:
+                skipped.append(heapq.heappop(load_heap))
+            if not load_heap:
+                break
+            _, index = heapq.heappop(load_heap)
+            for item in skipped:
+                heapq.heappush(load_heap, item)
+            self._dispatch(
+                invocation=self._queue.popleft(),
+                index=index,
+                cached_container=None,
+                cache_level=3,
+                invokers=invokers,
+                clock=clock,
+            )
+            # the invoker may have caught up with the clock, so reread its row
+            free_memory[index] = int(self._cluster_state.free_memory[index])
+            job_numbers[index] = int(self._cluster_state.job_numbers[index])
+            heapq.heappush(load_heap, (job_numbers[index] / cores[index], index))
+            routed_number += 1
+        return routed_number
+
     def decide_invoker(
-        self, mask, invokers: list[Invoker], invocation: Invocation
-    ) -> tuple[int, None | int]:
-        loads = (self._job_numbers / self._cores)[mask]
+        self,
+        mask,
+        invokers: list[Invoker],
+        invocation: Invocation,
+        clock: VirtualClock,
+    ) -> tuple[int, None | Container, int]:
+        loads = self._cluster_state.loads[mask]
         idx = np.argmin(loads)
         return np.arange(mask.shape[0])[mask][idx], None, 3
 
 
 class CacheAwareController(Controller):
     def decide_invoker(
-        self, mask, invokers: list[Invoker], invocation: Invocation
-    ) -> tuple[int, Any]:
-        highest_cache_level = 3
+        self,
+        mask,
+        invokers: list[Invoker],
+        invocation: Invocation,
+        clock: VirtualClock,
+    ) -> tuple[int, None | Container, int]:
+        cluster_state = self._cluster_state
+        # an invoker behind the clock may still list containers that expire at this
+        # time point, catch the warm candidates up before trusting the directory
+        for directory, key in (
+            (cluster_state.warm_functions, invocation.fun.id),
+            (cluster_state.warm_applications, invocation.app.id),
+        ):
+            for idx in list(directory.get(key, ())):
+                if mask[idx]:
+                    invokers[idx].advance_to(global_clock=clock)
+        loads = cluster_state.loads
+        # warm containers are found through the directory without scanning invokers
+        for cache_level, directory, key in (
+            (0, cluster_state.warm_functions, invocation.fun.id),
+            (1, cluster_state.warm_applications, invocation.app.id),
+        ):
+            candidates = [idx for idx in directory.get(key, ()) if mask[idx]]
+            if candidates:
+                invoker_idx = min(candidates, key=lambda idx: (loads[idx], idx))
+                cached_container, level = invokers[invoker_idx].get_cache(
+                    invocation=invocation
+                )
+                assert level == cache_level
+                return invoker_idx, cached_container, cache_level
+        idle_invokers = np.flatnonzero(
+            mask
+            & (cluster_state.job_numbers == 0)
+            & (cluster_state.cached_containers == 0)
+        )
+        if idle_invokers.size:
+            return int(idle_invokers[0]), None, 3
         invoker_idx = None
-        final_cache_idx = None
-        load = None
-        loads = self._job_numbers / self._cores
-        has_cache = False
-        for idx, stat in enumerate(self._invoker_stat):
-            if not mask[idx]:
-                continue
-            cache = stat["cache"]
-            if not cache and loads[idx] == 0:
-                invoker_idx = idx
-                final_cache_idx = None
-                break
-            if cache:
-                has_cache = True
-            cache_idx, cache_level = CacheInvoker.get_cache(
-                cache=cache, invocation=invocation
-            )
-            if cache_level < highest_cache_level:
-                highest_cache_level = cache_level
-                invoker_idx = idx
-                final_cache_idx = cache_idx
-                load = loads[idx]
-            elif cache_level == highest_cache_level and (
-                load is None or loads[idx] < load
+        final_cached_container = None
+        cached_invokers = np.flatnonzero(mask & (cluster_state.cached_containers > 0))
+        for idx in cached_invokers.tolist():
+            invokers[idx].advance_to(global_clock=clock)
+            cached_container, _ = invokers[idx].get_cache(invocation=invocation)
+            if cached_container is not None and (
+                invoker_idx is None or loads[idx] < loads[invoker_idx]
             ):
                 invoker_idx = idx
-                final_cache_idx = cache_idx
-                load = loads[idx]
-        if highest_cache_level == 3:
-            assert not has_cache
-        assert invoker_idx is not None
-        return invoker_idx, final_cache_idx, highest_cache_level
+                final_cached_container = cached_container
+        if invoker_idx is not None:
+            return invoker_idx, final_cached_container, 2
+        # prefer a cold start that doesn't force an eviction
+        candidates = np.flatnonzero(
+            mask & (cluster_state.headroom >= invocation.app.memory)
+        )
+        if not candidates.size:
+            candidates = np.flatnonzero(mask)
+        return int(candidates[np.argmin(loads[candidates])]), None, 3
 
 
 def get_controller(name: str) -> Controller:
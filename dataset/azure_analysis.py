@@ -14,7 +14,9 @@ from config import global_config, load_config
 
 from azure_distribution import (fit_fun_execution_time_distribution,
                                 fit_fun_invocation_distribution,
-                                fit_memory_distribution)
+                                fit_memory_distribution,
+                                get_execution_time_samples,
+                                get_invocation_samples, get_memory_samples)
 from azure_trace import ApplicationTrace, load_azure_trace
 
 
@@ -36,7 +38,8 @@ def plot_memory_cv_distribution(
 
 
 def plot_memory_distribution() -> None:
-    df, gm = fit_memory_distribution()
+    df = get_memory_samples()
+    gm = fit_memory_distribution()
     ax = sns.histplot(data=df, binrange=(0, 500), stat="density")
     ax.set(xlabel="Average allocated memory (MB)")
 
@@ -148,7 +151,8 @@ def plot_invocation_trigger_count(
 
 
 def plot_fun_execution_time_distribution(triggers: set | None = None) -> None:
-    df, fit_df, pdf, _ = fit_fun_execution_time_distribution(triggers)
+    df = get_execution_time_samples(triggers)
+    pdf, _ = fit_fun_execution_time_distribution(triggers)
 
     hue_order = sorted(df["trigger"].unique())
     ax = sns.histplot(
@@ -172,7 +176,8 @@ def plot_fun_execution_time_distribution(triggers: set | None = None) -> None:
 
 
 def plot_fun_invocation_distribution(trigger: str, weekday: bool) -> None:
-    df, poly = fit_fun_invocation_distribution(trigger, weekday)
+    df = get_invocation_samples(trigger, weekday)
+    poly = fit_fun_invocation_distribution(trigger, weekday)
     x = np.arange(0, 1440, 1)
     df["Polynomial fit"] = poly(x)
 
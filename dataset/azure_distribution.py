@@ -4,26 +4,31 @@ import sys
 
 import numpy as np
 import scipy
-from cyy_naive_lib.storage import persistent_cache
 from sklearn.mixture import GaussianMixture
 
 sys.path.insert(0, os.path.dirname(__file__))
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
 import pandas as pd
 
-from azure_trace import ApplicationTrace, cache_dir, load_azure_trace
+from fit_cache import fit_cache
+from synthetic_workload import parameter_version
+from trace_store import day_number, load_trace_store
 
 
-@persistent_cache(path=os.path.join(cache_dir, "__fit_memory_distribution.pk"))
-def fit_memory_distribution() -> tuple[pd.DataFrame, GaussianMixture]:
-    azure_application_traces: list[ApplicationTrace] = load_azure_trace()
-    # follow a two modal Gaussian distribution
-    avg_memory_list = []
-    for app_trace in azure_application_traces:
-        for memory in app_trace.avg_memory:
-            avg_memory_list.append({"app_id": app_trace.name, "avg_memory": memory})
+def get_memory_samples() -> pd.DataFrame:
+    store = load_trace_store()
+    return pd.DataFrame(
+        data={
+            "app_id": np.repeat(store.app_names, np.diff(store.memory_offsets)),
+            "avg_memory": store.memories,
+        }
+    )
 
-    df = pd.DataFrame(data=avg_memory_list)
+
+@fit_cache
+def __fit_memory_parameters() -> dict:
+    # follow a two modal Gaussian distribution
+    df = get_memory_samples()
     print("75th percentile is", df["avg_memory"].quantile(0.75))
     print("95th percentile is", df["avg_memory"].quantile(0.95))
     X = df["avg_memory"]
@@ -31,96 +36,120 @@ def fit_memory_distribution() -> tuple[pd.DataFrame, GaussianMixture]:
     gm = GaussianMixture(n_components=3, covariance_type="spherical").fit(
         np.asarray(X).reshape(-1, 1)
     )
-    # print("means", gm.means_)
-    # print("covariance", gm.covariances_)
-    # print("weights", gm.weights_)
-    return df, gm
+    return {
+        "weights": gm.weights_.tolist(),
+        "means": gm.means_.tolist(),
+        "covariances": gm.covariances_.tolist(),
+    }
 
 
-@persistent_cache(
-    path=os.path.join(cache_dir, "__fit_fun_execution_time_distribution.pk")
-)
-def fit_fun_execution_time_distribution(
-    triggers: set | None = None, fit_trigger="http"
-) -> tuple:
-    azure_application_traces: list[ApplicationTrace] = load_azure_trace()
-    avg_exec_time_list = []
-    for app_trace in azure_application_traces:
-        for fun_trace in app_trace.functions.values():
-            for exec_time in fun_trace.avg_execution_times:
-                avg_exec_time_list.append(
-                    {
-                        "fun_id": fun_trace.name,
-                        "avg_exec_time": exec_time,
-                        "trigger": "all",
+def fit_memory_distribution() -> GaussianMixture:
+    parameters = __fit_memory_parameters()
+    gm = GaussianMixture(
+        n_components=len(parameters["weights"]), covariance_type="spherical"
+    )
+    gm.weights_ = np.asarray(parameters["weights"])
+    gm.means_ = np.asarray(parameters["means"])
+    gm.covariances_ = np.asarray(parameters["covariances"])
+    gm.precisions_cholesky_ = 1 / np.sqrt(gm.covariances_)
+    return gm
+
+
+def get_execution_time_samples(triggers: set | None = None) -> pd.DataFrame:
+    store = load_trace_store()
+    fun_ids = np.repeat(store.fun_names, np.diff(store.duration_offsets))
+    frames = [
+        pd.DataFrame(
+            data={
+                "fun_id": fun_ids,
+                "avg_exec_time": store.durations,
+                "trigger": "all",
+            }
+        )
+    ]
+    if triggers is not None:
+        # functions invoked by a single trigger
+        invoked = store.series_totals > 0
+        fun_trigger_numbers = np.bincount(
+            store.series_functions[invoked], minlength=store.function_number
+        )
+        fun_triggers = np.full(store.function_number, -1, dtype=np.int64)
+        fun_triggers[store.series_functions[invoked]] = store.series_triggers[invoked]
+        for trigger in triggers:
+            trigger_idx = store.trigger_index(trigger)
+            if trigger_idx is None:
+                continue
+            mask = (fun_trigger_numbers == 1) & (fun_triggers == trigger_idx)
+            duration_numbers = np.diff(store.duration_offsets)
+            frames.append(
+                pd.DataFrame(
+                    data={
+                        "fun_id": np.repeat(
+                            store.fun_names[mask], duration_numbers[mask]
+                        ),
+                        "avg_exec_time": store.durations[
+                            np.repeat(mask, duration_numbers)
+                        ],
+                        "trigger": trigger,
                     }
                 )
-            if triggers is not None:
-                if len(fun_trace.trigger_count) != 1:
-                    continue
-                trigger = next(iter(fun_trace.trigger_count.keys()))
-                if trigger not in triggers:
-                    continue
-                for exec_time in fun_trace.avg_execution_times:
-                    avg_exec_time_list.append(
-                        {
-                            "fun_id": fun_trace.name,
-                            "avg_exec_time": exec_time,
-                            "trigger": trigger,
-                        }
-                    )
-    assert avg_exec_time_list
-
-    df: pd.DataFrame = pd.DataFrame(
-        data=avg_exec_time_list,
-    )
+            )
+    assert store.durations.shape[0]
+
+    return pd.concat(frames, ignore_index=True)
+
+
+@fit_cache
+def __fit_execution_time_parameters(triggers: set | None, fit_trigger: str) -> dict:
+    df = get_execution_time_samples(triggers)
     fit_df = df[df["trigger"] == fit_trigger]
     print("75th percentile is", fit_df["avg_exec_time"].quantile(0.75))
     print("95th percentile is", fit_df["avg_exec_time"].quantile(0.95))
 
     X = fit_df["avg_exec_time"].to_numpy()
     s, loc, scale = scipy.stats.lognorm.fit(X)
+    return {"s": float(s), "loc": float(loc), "scale": float(scale)}
+
+
+def fit_fun_execution_time_distribution(
+    triggers: set | None = None, fit_trigger="http"
+) -> tuple:
+    parameters = __fit_execution_time_parameters(triggers, fit_trigger)
+    s, loc, scale = parameters["s"], parameters["loc"], parameters["scale"]
     pdf = functools.partial(scipy.stats.lognorm.pdf, s=s, loc=loc, scale=scale)
     return (
-        df,
-        fit_df,
         pdf,
         functools.partial(scipy.stats.lognorm.rvs, s, loc=loc, scale=scale),
     )
 
 
-@persistent_cache(path=os.path.join(cache_dir, "__fit_fun_invocation_distribution.pk"))
-def fit_fun_invocation_distribution(
-    trigger: str, weekday: bool
-) -> tuple[pd.DataFrame, np.poly1d]:
-    azure_application_traces: list[ApplicationTrace] = load_azure_trace()
+def get_invocation_samples(trigger: str, weekday: bool) -> pd.DataFrame:
+    store = load_trace_store()
     total_invocation_number = {}
-
-    for app_trace in azure_application_traces:
-        for fun_trace in app_trace.functions.values():
-            if not fun_trace.invocation_numbers:
+    trigger_idx = store.trigger_index(trigger)
+    series = np.flatnonzero(np.asarray(store.series_triggers) == trigger_idx)
+    for day in range(1, day_number + 1):
+        if day == 9:
+            # outlier
+            continue
+        if not weekday:
+            if day not in (6, 7, 13, 14):
+                continue
+        else:
+            if day in (6, 7, 13, 14):
                 continue
-            for day, day_invocation_numbers in fun_trace.invocation_numbers.items():
-                invocation_number = day_invocation_numbers.get(trigger, None)
-                if invocation_number is None:
-                    continue
-                if day == 9:
-                    # outlier
-                    continue
-                if not weekday:
-                    if day not in (6, 7, 13, 14):
-                        continue
-                else:
-                    if day in (6, 7, 13, 14):
-                        continue
-                day = f"day_{day}"
-                if day not in total_invocation_number:
-                    total_invocation_number[day] = invocation_number
-                else:
-                    total_invocation_number[day] += invocation_number
-
-    df = pd.DataFrame(data=total_invocation_number)
+        invocation_number = store.invocations[series, day - 1].sum(
+            axis=0, dtype=np.int64
+        )
+        if invocation_number.sum() > 0:
+            total_invocation_number[f"day_{day}"] = invocation_number
 
+    return pd.DataFrame(data=total_invocation_number)
+
+
+@fit_cache
+def __fit_invocation_parameters(trigger: str, weekday: bool) -> dict:
+    df = get_invocation_samples(trigger, weekday)
     df_np: np.ndarray = df.to_numpy(dtype=np.float64)
 
     columns = np.hsplit(df_np, df_np.shape[1])
@@ -130,5 +159,21 @@ def fit_fun_invocation_distribution(
         new_columns.append(column)
     samples = np.concatenate(new_columns, axis=0)
     z = np.polyfit(samples[:, 0].reshape(-1), samples[:, 1].reshape(-1), 5)
-    poly = np.poly1d(z)
-    return df, poly
+    return {"coefficients": z.tolist()}
+
+
+def fit_fun_invocation_distribution(trigger: str, weekday: bool) -> np.poly1d:
+    return np.poly1d(__fit_invocation_parameters(trigger, weekday)["coefficients"])
+
+
+def get_workload_parameters() -> dict:
+    # the fitted distributions in the format of the synthetic workload
+    return {
+        "version": parameter_version,
+        "source": "fitted to the Azure Functions 2019 trace",
+        "memory": __fit_memory_parameters(),
+        "execution_time": __fit_execution_time_parameters(
+            triggers={"http"}, fit_trigger="http"
+        ),
+        "invocation": __fit_invocation_parameters(trigger="http", weekday=True),
+    }
@@ -1,11 +1,12 @@
 import os
-import pickle
 import sys
 
 import numpy
 import numpy.typing as npt
-import pandas
-from config import global_config
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from trace_store import cache_dir, day_number, load_trace_store
 
 _application_trace_list = None
 
@@ -91,77 +92,28 @@ class ApplicationTrace:
         return self.functions and self.avg_memory
 
 
-def __load_fun_invocation(trace_dir: str, application_traces: dict) -> None:
-    for day in range(1, 15):
-        file = os.path.join(
-            trace_dir, f"invocations_per_function_md.anon.d{day:02}.csv"
-        )
-        df = pandas.read_csv(file)
-        for _, row in df.iterrows():
-            app_name = row["HashApp"]
-            if app_name not in application_traces:
-                application_traces[app_name] = ApplicationTrace(name=app_name)
-            app = application_traces[app_name]
-            fun_name = row["HashFunction"]
-            fun = app.get_function_trace(fun_name=fun_name)
-            if fun is None:
-                fun = FunctionTrace(name=fun_name)
-                app.add_function_trace(fun)
-            fun.add_invocation_number(day, row["Trigger"], row[4:].to_numpy())
-
-
-def __load_fun_duration(trace_dir: str, application_traces: dict) -> None:
-    for day in range(1, 15):
-        file = os.path.join(
-            trace_dir, f"function_durations_percentiles.anon.d{day:02}.csv"
-        )
-        df = pandas.read_csv(file)
-        for _, row in df.iterrows():
-            app_name = row["HashApp"]
-            if app_name not in application_traces:
-                application_traces[app_name] = ApplicationTrace(app_name)
-            app = application_traces[app_name]
-            fun_name = row["HashFunction"]
-            fun = app.get_function_trace(fun_name=fun_name)
-            if fun is None:
-                fun = FunctionTrace(name=fun_name)
-                app.add_function_trace(fun)
-            fun.add_execution_time(row["Average"], row[7:].to_numpy())
-
-
-def __load_memory(trace_dir: str, application_traces: dict) -> None:
-    for day in range(1, 12):
-        file = os.path.join(trace_dir, f"app_memory_percentiles.anon.d{day:02}.csv")
-        df = pandas.read_csv(file)
-        for _, row in df.iterrows():
-            app_name = row["HashApp"]
-            if app_name not in application_traces:
-                application_traces[app_name] = ApplicationTrace(app_name)
-            app = application_traces[app_name]
-            app.avg_memory.append(row["AverageAllocatedMb"])
-
-
-cache_dir = os.path.join(os.path.dirname(__file__), ".cache")
-
-
 def load_azure_trace() -> list[ApplicationTrace]:
-    trace_dir = global_config["azure_trace_dir"]
+    # the object view of the trace store, invocation arrays are memory-mapped rows
     global _application_trace_list
     if _application_trace_list is not None:
         return _application_trace_list
-    os.makedirs(cache_dir, exist_ok=True)
-    cache_file = os.path.join(cache_dir, "azure_trace.pk")
-    if os.path.isfile(cache_file):
-        print(f"load cache from {cache_file}")
-        with open(cache_file, "rb") as f:
-            sys.path.insert(0, os.path.dirname(__file__))
-            _application_trace_list = pickle.load(f)
-            return _application_trace_list
-    application_traces: dict[str, ApplicationTrace] = {}
-    __load_fun_invocation(trace_dir=trace_dir, application_traces=application_traces)
-    __load_fun_duration(trace_dir=trace_dir, application_traces=application_traces)
-    __load_memory(trace_dir=trace_dir, application_traces=application_traces)
-    _application_trace_list = list(application_traces.values())
-    with open(cache_file, "wb") as f:
-        pickle.dump(_application_trace_list, f)
+    store = load_trace_store()
+    application_traces = [
+        ApplicationTrace(name=app_name) for app_name in store.app_names.tolist()
+    ]
+    for app_idx, app_trace in enumerate(application_traces):
+        app_trace.avg_memory += store.application_memories(app_idx).tolist()
+    fun_apps = store.fun_apps.tolist()
+    series_triggers = store.series_triggers.tolist()
+    for fun_idx, fun_name in enumerate(store.fun_names.tolist()):
+        fun = FunctionTrace(name=fun_name)
+        application_traces[fun_apps[fun_idx]].add_function_trace(fun)
+        fun.avg_execution_times.extend(store.function_durations(fun_idx).tolist())
+        for series_idx in store.function_series(fun_idx):
+            trigger = store.triggers[series_triggers[series_idx]]
+            for day_idx in range(day_number):
+                fun.add_invocation_number(
+                    day_idx + 1, trigger, store.invocations[series_idx, day_idx]
+                )
+    _application_trace_list = application_traces
     return _application_trace_list
@@ -0,0 +1,23 @@
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from config import global_config, load_config
+
+from azure_distribution import get_workload_parameters
+from synthetic_workload import default_parameter_path
+
+if __name__ == "__main__":
+    load_config()
+    # fit the trace at azure_trace_dir and write the parameters of the synthetic
+    # workload, by default over the shipped file
+    path = global_config.get("workload_parameters", None)
+    if path is None:
+        path = default_parameter_path
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(get_workload_parameters(), f, indent=2, sort_keys=True)
+        f.write("\n")
+    print("save workload parameters to", path)
@@ -0,0 +1,53 @@
+import functools
+import hashlib
+import inspect
+import json
+import os
+from typing import Any, Callable
+
+from trace_store import cache_dir, trace_fingerprint
+
+fit_cache_dir = os.path.join(cache_dir, "fits")
+
+
+def __normalize(value: Any) -> Any:
+    if isinstance(value, (set, frozenset)):
+        return sorted(value)
+    return value
+
+
+def fit_cache(fun: Callable) -> Callable:
+    # each entry holds the JSON parameters returned by the fit, keyed by the
+    # function, its bound arguments and the fingerprint of the trace files
+    signature = inspect.signature(fun)
+
+    @functools.wraps(fun)
+    def wrapper(*args, **kwargs) -> dict:
+        arguments = signature.bind(*args, **kwargs)
+        arguments.apply_defaults()
+        key = {
+            "function": fun.__name__,
+            "arguments": {
+                name: __normalize(value)
+                for name, value in arguments.arguments.items()
+            },
+            "trace": trace_fingerprint(),
+        }
+        digest = hashlib.sha256(
+            json.dumps(key, sort_keys=True).encode("utf-8")
+        ).hexdigest()[:16]
+        path = os.path.join(fit_cache_dir, f"{fun.__name__}.{digest}.json")
+        if os.path.isfile(path):
+            with open(path, encoding="utf-8") as f:
+                entry = json.load(f)
+            if entry["key"] == key:
+                return entry["parameters"]
+        parameters = fun(*args, **kwargs)
+        os.makedirs(fit_cache_dir, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"key": key, "parameters": parameters}, f, sort_keys=True)
+        os.replace(tmp_path, path)
+        return parameters
+
+    return wrapper
@@ -0,0 +1,83 @@
+import os
+import random
+import sys
+from datetime import timedelta
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from config import global_config
+from simulated_concept import SimulatedApplication, SimulatedFunction
+from workload import Workload
+
+from trace_store import day_minutes, load_trace_store
+
+
+class ReplayWorkload(Workload):
+    def __init__(self):
+        # counts are read from the memory-mapped trace store one minute at a time
+        self.__store = load_trace_store()
+        complete_functions = self.__store.complete_functions()
+        complete_applications = [
+            app_idx
+            for app_idx in range(self.__store.application_number)
+            if self.__store.application_memories(app_idx).shape[0]
+            and np.any(complete_functions[self.__store.application_functions(app_idx)])
+        ]
+        application_number = min(
+            global_config["application_number"], len(complete_applications)
+        )
+        applications: list[SimulatedApplication] = []
+        series_indices: list[int] = []
+        series_positions: list[int] = []
+        fun_number = 0
+        selected_app_indices = sorted(
+            random.sample(complete_applications, application_number)
+        )
+        for app_idx in selected_app_indices:
+            applications.append(
+                SimulatedApplication(
+                    memory=int(
+                        round(np.mean(self.__store.application_memories(app_idx)))
+                    )
+                )
+            )
+            for fun_idx in self.__store.application_functions(app_idx).tolist():
+                if not complete_functions[fun_idx]:
+                    continue
+                exec_time = np.mean(self.__store.function_durations(fun_idx))
+                applications[-1].add_fun(
+                    SimulatedFunction(
+                        exec_time=timedelta(milliseconds=max(exec_time, 1))
+                    )
+                )
+                for series_idx in self.__store.function_series(fun_idx):
+                    series_indices.append(series_idx)
+                    series_positions.append(fun_number)
+                fun_number += 1
+        super().__init__(applications=applications)
+        self.__series_indices = np.asarray(series_indices, dtype=np.int64)
+        self.__series_positions = np.asarray(series_positions, dtype=np.int64)
+        self.__start_minute: int = global_config.get("replay_start_minute", 0)
+        self.__invocation_scale: float = global_config.get(
+            "replay_invocation_scale", 1.0
+        )
+        print("replay", len(applications), "applications")
+        print("replay", len(self.functions), "functions")
+
+    def _invocation_rates(self, minute: int, simulation_minutes: int) -> np.ndarray:
+        # one simulated minute replays one recorded minute, summed over triggers
+        day_idx, day_minute = divmod(minute + self.__start_minute, day_minutes)
+        if day_idx >= self.__store.invocations.shape[1]:
+            raise RuntimeError("replay is beyond the recorded trace", minute)
+        counts = self.__store.invocations[self.__series_indices, day_idx, day_minute]
+        return (
+            np.bincount(
+                self.__series_positions,
+                weights=counts,
+                minlength=len(self.functions),
+            )
+            * self.__invocation_scale
+        )
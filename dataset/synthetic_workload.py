@@ -0,0 +1,139 @@
+import json
+import os
+import random
+import sys
+from datetime import timedelta
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from config import global_config
+from simulated_concept import SimulatedApplication, SimulatedFunction
+from workload import Workload
+
+parameter_version = 1
+default_parameter_path = os.path.join(
+    os.path.dirname(__file__), "workload_parameters.json"
+)
+
+
+def load_workload_parameters(path: str | None = None) -> dict:
+    if path is None:
+        path = default_parameter_path
+    with open(path, encoding="utf-8") as f:
+        parameters = json.load(f)
+    if parameters.get("version", None) != parameter_version:
+        raise RuntimeError(
+            "unsupported workload parameter version", path, parameters.get("version")
+        )
+    return parameters
+
+
+class SyntheticWorkload(Workload):
+    def __init__(self, parameters: dict | None = None):
+        # the distributions are sampled with NumPy only, in the same order and from
+        # the same global random state as the scikit-learn and SciPy samplers
+        if parameters is None:
+            parameters = load_workload_parameters(
+                global_config.get("workload_parameters", None)
+            )
+        applications = self.__sample_applications(parameters)
+        super().__init__(applications=applications)
+        print(
+            "generate",
+            len(applications),
+            "applications",
+        )
+        print(
+            "generate",
+            len(self.functions),
+            "functions",
+        )
+        self.__invocation_poly = np.poly1d(parameters["invocation"]["coefficients"])
+        self.__daily_invocation_count = float(
+            np.mean(self.__invocation_poly(np.arange(24 * 60)))
+        )
+
+    def _invocation_rates(self, minute: int, simulation_minutes: int) -> np.ndarray:
+        cur_minute = self.__day_minute(minute, simulation_minutes)
+        application_invocation_limit = global_config["application_invocation_limit"]
+
+        invocation_count = int(self.__invocation_poly(cur_minute))
+        if invocation_count <= 0:
+            raise RuntimeError(cur_minute, self.__invocation_poly(cur_minute))
+        function_invocations = np.full(
+            len(self.functions), invocation_count, dtype=np.int64
+        )
+        invocation_rates = (
+            function_invocations
+            * application_invocation_limit
+            / function_invocations.sum()
+        )
+        assert np.all(np.round(invocation_rates) > 0)
+        return invocation_rates
+
+    def _arrival_intensity(self, minute: int, simulation_minutes: int) -> float:
+        # the rates are normalized to application_invocation_limit in every minute,
+        # Poisson arrivals follow the invocation curve relative to its daily mean
+        cur_minute = self.__day_minute(minute, simulation_minutes)
+        return float(self.__invocation_poly(cur_minute)) / self.__daily_invocation_count
+
+    @classmethod
+    def __day_minute(cls, minute: int, simulation_minutes: int) -> int:
+        # the day curve is compressed into the simulated minutes
+        return int(minute * simulation_minutes / (24 * 60))
+
+    @classmethod
+    def __sample_applications(cls, parameters: dict) -> list[SimulatedApplication]:
+        application_number = global_config["application_number"]
+        memory_list = (
+            cls.__sample_memories(parameters["memory"], size=application_number)
+            .reshape(-1)
+            .astype(dtype=np.int64)
+            .tolist()
+        )
+        applications: list[SimulatedApplication] = []
+        functions = cls.__sample_functions(
+            parameters["execution_time"], size=5 * application_number
+        )
+        for i in range(application_number):
+            applications.append(SimulatedApplication(memory=memory_list[i]))
+            for _ in range(random.randint(1, 5)):
+                applications[-1].add_fun(functions[0])
+                functions = functions[1:]
+        return applications
+
+    @classmethod
+    def __sample_memories(cls, parameters: dict, size: int) -> np.ndarray:
+        # a Gaussian mixture with spherical covariances, grouped by component
+        component_sizes = np.random.multinomial(size, parameters["weights"])
+        return np.vstack(
+            [
+                np.asarray(mean)
+                + np.random.standard_normal(size=(component_size, len(mean)))
+                * np.sqrt(covariance)
+                for mean, covariance, component_size in zip(
+                    parameters["means"], parameters["covariances"], component_sizes
+                )
+            ]
+        )
+
+    @classmethod
+    def __sample_functions(cls, parameters: dict, size: int) -> list[SimulatedFunction]:
+        # a log-normal distribution of the execution time in milliseconds
+        exec_time_list = (
+            (
+                np.exp(parameters["s"] * np.random.standard_normal(size))
+                * parameters["scale"]
+                + parameters["loc"]
+            )
+            .astype(dtype=np.int64)
+            .clip(1, None)
+            .tolist()
+        )
+        return [
+            SimulatedFunction(exec_time=timedelta(milliseconds=exec_time))
+            for exec_time in exec_time_list
+        ]
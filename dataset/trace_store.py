@@ -0,0 +1,334 @@
+import concurrent.futures
+import hashlib
+import json
+import os
+
+import numpy as np
+import pandas
+from config import global_config
+
+cache_dir = os.path.join(os.path.dirname(__file__), ".cache")
+store_dir = os.path.join(cache_dir, "trace_store")
+day_number = 14
+memory_day_number = 11
+day_minutes = 24 * 60
+
+_trace_store = None
+
+
+def trace_fingerprint(trace_dir: str | None = None) -> str:
+    # the trace directory with the names, sizes and modification times of its files
+    if trace_dir is None:
+        trace_dir = global_config["azure_trace_dir"]
+    trace_dir = os.path.abspath(trace_dir)
+    files = []
+    if os.path.isdir(trace_dir):
+        for name in sorted(os.listdir(trace_dir)):
+            if not name.endswith(".csv"):
+                continue
+            stat = os.stat(os.path.join(trace_dir, name))
+            files.append([name, stat.st_size, stat.st_mtime_ns])
+    return hashlib.sha256(
+        json.dumps([trace_dir, files]).encode("utf-8")
+    ).hexdigest()
+
+
+def __read_invocation_day(file: str, matrix_file: str) -> pandas.DataFrame:
+    # the count matrix goes to a scratch file so that the merge can memory-map it
+    df = pandas.read_csv(file)
+    np.save(matrix_file, df.iloc[:, 4:].to_numpy(dtype=np.int32))
+    return df[["HashApp", "HashFunction", "Trigger"]]
+
+
+def __read_duration_day(file: str) -> pandas.DataFrame:
+    # every row numbers its function, but only positive averages with positive
+    # percentiles are kept as durations
+    df = pandas.read_csv(file)
+    valid = (df["Average"] > 0) & (df.iloc[:, 7:].sum(axis=1) > 0)
+    return pandas.DataFrame(
+        {
+            "HashApp": df["HashApp"],
+            "HashFunction": df["HashFunction"],
+            "Average": df["Average"].where(valid),
+        }
+    )
+
+
+def __read_memory_day(file: str) -> pandas.DataFrame:
+    df = pandas.read_csv(file)
+    return df[["HashApp", "AverageAllocatedMb"]]
+
+
+def __save_ragged(
+    name: str, indices: np.ndarray, values: np.ndarray, number: int
+) -> None:
+    # the values of each index in their original order
+    np.save(
+        os.path.join(store_dir, f"{name}_offsets.npy"),
+        np.concatenate(
+            [[0], np.cumsum(np.bincount(indices, minlength=number))]
+        ).astype(np.int64),
+    )
+    np.save(
+        os.path.join(store_dir, f"{name}.npy"),
+        values[np.argsort(indices, kind="stable")].astype(np.float64),
+    )
+
+
+def __first_seen(codes: np.ndarray) -> np.ndarray:
+    # the row of the first appearance of each code
+    return np.unique(codes, return_index=True)[1]
+
+
+def build_trace_store(trace_dir: str) -> None:
+    os.makedirs(store_dir, exist_ok=True)
+    fingerprint_file = os.path.join(store_dir, "fingerprint.json")
+    if os.path.isfile(fingerprint_file):
+        os.remove(fingerprint_file)
+    invocation_files = [
+        os.path.join(trace_dir, f"invocations_per_function_md.anon.d{day:02}.csv")
+        for day in range(1, day_number + 1)
+    ]
+    matrix_files = [
+        os.path.join(store_dir, f"invocations_d{day:02}.tmp.npy")
+        for day in range(1, day_number + 1)
+    ]
+    duration_files = [
+        os.path.join(trace_dir, f"function_durations_percentiles.anon.d{day:02}.csv")
+        for day in range(1, day_number + 1)
+    ]
+    memory_files = [
+        os.path.join(trace_dir, f"app_memory_percentiles.anon.d{day:02}.csv")
+        for day in range(1, memory_day_number + 1)
+    ]
+
+    # day files are parsed in parallel and concatenated in order
+    with concurrent.futures.ProcessPoolExecutor() as executor:
+        invocation_days = list(
+            executor.map(__read_invocation_day, invocation_files, matrix_files)
+        )
+        duration_days = list(executor.map(__read_duration_day, duration_files))
+        memory_days = list(executor.map(__read_memory_day, memory_files))
+    invocation_rows = pandas.concat(invocation_days, ignore_index=True)
+    duration_rows = pandas.concat(duration_days, ignore_index=True)
+    memory_rows = pandas.concat(memory_days, ignore_index=True)
+
+    # applications and functions are numbered in order of first appearance in the
+    # invocation days, then the duration days, then the memory days
+    function_rows = pandas.concat(
+        [
+            invocation_rows[["HashApp", "HashFunction"]],
+            duration_rows[["HashApp", "HashFunction"]],
+        ],
+        ignore_index=True,
+    )
+    app_codes, app_names = pandas.factorize(
+        pandas.concat(
+            [function_rows["HashApp"], memory_rows["HashApp"]], ignore_index=True
+        ),
+        use_na_sentinel=False,
+    )
+    fun_codes = (
+        function_rows.groupby(["HashApp", "HashFunction"], sort=False, dropna=False)
+        .ngroup()
+        .to_numpy()
+    )
+    fun_rows = __first_seen(fun_codes)
+    fun_names = function_rows["HashFunction"].to_numpy()[fun_rows]
+    fun_apps = app_codes[fun_rows]
+    # one invocation series per function and trigger
+    invocation_fun_codes = fun_codes[: len(invocation_rows)]
+    series_codes = (
+        pandas.DataFrame(
+            {"function": invocation_fun_codes, "trigger": invocation_rows["Trigger"]}
+        )
+        .groupby(["function", "trigger"], sort=False, dropna=False)
+        .ngroup()
+        .to_numpy()
+    )
+    series_rows = __first_seen(series_codes)
+    series_functions = invocation_fun_codes[series_rows]
+    series_triggers = invocation_rows["Trigger"].to_numpy()[series_rows]
+    day_series = np.split(
+        series_codes, np.cumsum([len(day) for day in invocation_days])[:-1]
+    )
+
+    # series of a function are stored next to each other
+    order = np.argsort(series_functions, kind="stable")
+    series_positions = np.empty_like(order)
+    series_positions[order] = np.arange(order.shape[0])
+    sorted_series_functions = series_functions[order].astype(np.int64)
+    trigger_names = np.unique(series_triggers)
+
+    tmp_invocation_file = os.path.join(store_dir, "invocations.tmp.npy")
+    invocations = np.lib.format.open_memmap(
+        tmp_invocation_file,
+        mode="w+",
+        dtype=np.int32,
+        shape=(order.shape[0], day_number, day_minutes),
+    )
+    series_totals = np.zeros(order.shape[0], dtype=np.int64)
+    for day_idx, (matrix_file, indices) in enumerate(zip(matrix_files, day_series)):
+        day_matrix = np.load(matrix_file, mmap_mode="r")
+        positions = series_positions[indices]
+        if np.unique(positions).shape[0] == positions.shape[0]:
+            invocations[positions, day_idx] = day_matrix
+        else:
+            # a function listed twice with the same trigger on a day is summed
+            np.add.at(invocations[:, day_idx], positions, day_matrix)
+        np.add.at(series_totals, positions, day_matrix.sum(axis=1, dtype=np.int64))
+        del day_matrix
+        os.remove(matrix_file)
+    invocations.flush()
+    del invocations
+
+    tables = {
+        "app_names": np.asarray(app_names, dtype=np.str_),
+        "fun_names": np.asarray(fun_names, dtype=np.str_),
+        "fun_apps": fun_apps.astype(np.int64),
+        "series_functions": sorted_series_functions,
+        "series_offsets": np.searchsorted(
+            sorted_series_functions, np.arange(len(fun_names) + 1)
+        ).astype(np.int64),
+        "series_triggers": np.searchsorted(trigger_names, series_triggers).astype(
+            np.int64
+        )[order],
+        "series_totals": series_totals,
+        "triggers": np.asarray(trigger_names, dtype=np.str_),
+    }
+    for name, table in tables.items():
+        np.save(os.path.join(store_dir, f"{name}.npy"), table)
+    durations = duration_rows["Average"].notna().to_numpy()
+    __save_ragged(
+        "durations",
+        fun_codes[len(invocation_rows) :][durations],
+        duration_rows["Average"].to_numpy()[durations],
+        len(fun_names),
+    )
+    __save_ragged(
+        "memories",
+        app_codes[len(function_rows) :],
+        memory_rows["AverageAllocatedMb"].to_numpy(),
+        len(app_names),
+    )
+    with open(fingerprint_file, "w", encoding="utf-8") as f:
+        json.dump(trace_fingerprint(trace_dir), f)
+    # the invocation matrix is the last file to appear, so a partial build is redone
+    os.replace(tmp_invocation_file, os.path.join(store_dir, "invocations.npy"))
+
+
+class TraceStore:
+    def __init__(self):
+        # every table is memory-mapped, slices are read from the page cache
+        self.invocations = self.__load("invocations")
+        self.app_names = self.__load("app_names")
+        self.fun_names = self.__load("fun_names")
+        self.fun_apps = self.__load("fun_apps")
+        self.series_functions = self.__load("series_functions")
+        self.series_offsets = self.__load("series_offsets")
+        self.series_triggers = self.__load("series_triggers")
+        self.series_totals = self.__load("series_totals")
+        self.triggers: list[str] = self.__load("triggers").tolist()
+        self.durations = self.__load("durations")
+        self.duration_offsets = self.__load("durations_offsets")
+        self.memories = self.__load("memories")
+        self.memory_offsets = self.__load("memories_offsets")
+        self.__app_indices: dict[str, int] | None = None
+        self.__fun_indices: dict[tuple[str, str], int] | None = None
+        self.__app_functions: np.ndarray | None = None
+        self.__app_function_offsets: np.ndarray | None = None
+
+    @property
+    def application_number(self) -> int:
+        return self.app_names.shape[0]
+
+    @property
+    def function_number(self) -> int:
+        return self.fun_names.shape[0]
+
+    def application_index(self, app_name: str) -> int | None:
+        if self.__app_indices is None:
+            self.__app_indices = {
+                name: idx for idx, name in enumerate(self.app_names.tolist())
+            }
+        return self.__app_indices.get(app_name)
+
+    def function_index(self, app_name: str, fun_name: str) -> int | None:
+        if self.__fun_indices is None:
+            app_names = self.app_names.tolist()
+            self.__fun_indices = {
+                (app_names[app_idx], name): idx
+                for idx, (name, app_idx) in enumerate(
+                    zip(self.fun_names.tolist(), self.fun_apps.tolist())
+                )
+            }
+        return self.__fun_indices.get((app_name, fun_name))
+
+    def trigger_index(self, trigger: str) -> int | None:
+        if trigger not in self.triggers:
+            return None
+        return self.triggers.index(trigger)
+
+    def application_functions(self, app_idx: int) -> np.ndarray:
+        if self.__app_functions is None:
+            self.__app_functions = np.argsort(self.fun_apps, kind="stable")
+            self.__app_function_offsets = np.searchsorted(
+                self.fun_apps[self.__app_functions],
+                np.arange(self.application_number + 1),
+            )
+        return self.__app_functions[
+            self.__app_function_offsets[app_idx] : self.__app_function_offsets[
+                app_idx + 1
+            ]
+        ]
+
+    def application_memories(self, app_idx: int) -> np.ndarray:
+        return self.memories[
+            self.memory_offsets[app_idx] : self.memory_offsets[app_idx + 1]
+        ]
+
+    def function_durations(self, fun_idx: int) -> np.ndarray:
+        return self.durations[
+            self.duration_offsets[fun_idx] : self.duration_offsets[fun_idx + 1]
+        ]
+
+    def function_series(self, fun_idx: int) -> range:
+        return range(self.series_offsets[fun_idx], self.series_offsets[fun_idx + 1])
+
+    def function_invocations(self, fun_idx: int) -> np.ndarray:
+        # day x minute counts summed over the triggers of the function
+        series = self.function_series(fun_idx)
+        return self.invocations[series.start : series.stop].sum(axis=0)
+
+    def complete_functions(self) -> np.ndarray:
+        # functions that were invoked and have execution times
+        invoked = np.bincount(
+            self.series_functions,
+            weights=self.series_totals > 0,
+            minlength=self.function_number,
+        )
+        return (invoked > 0) & (np.diff(self.duration_offsets) > 0)
+
+    @classmethod
+    def __load(cls, name: str) -> np.ndarray:
+        return np.load(os.path.join(store_dir, f"{name}.npy"), mmap_mode="r")
+
+
+def load_trace_store() -> TraceStore:
+    global _trace_store
+    if _trace_store is None:
+        trace_dir = global_config["azure_trace_dir"]
+        if __stored_fingerprint() != trace_fingerprint(trace_dir):
+            build_trace_store(trace_dir=trace_dir)
+        _trace_store = TraceStore()
+    return _trace_store
+
+
+def __stored_fingerprint() -> str | None:
+    fingerprint_file = os.path.join(store_dir, "fingerprint.json")
+    if not os.path.isfile(os.path.join(store_dir, "invocations.npy")):
+        return None
+    if not os.path.isfile(fingerprint_file):
+        return None
+    with open(fingerprint_file, encoding="utf-8") as f:
+        return json.load(f)
@@ -0,0 +1,32 @@
+import heapq
+import itertools
+from enum import IntEnum
+from typing import Any
+
+
+class EventType(IntEnum):
+    # events sharing a time point are processed in this order
+    INVOKER = 0
+    ARRIVAL = 1
+
+
+class EventQueue:
+    def __init__(self):
+        self.__heap: list = []
+        self.__counter = itertools.count()
+
+    def __len__(self) -> int:
+        return len(self.__heap)
+
+    def push(self, time_point, event_type: EventType, payload: Any = None) -> None:
+        heapq.heappush(
+            self.__heap, (time_point, event_type, next(self.__counter), payload)
+        )
+
+    def peek(self) -> tuple:
+        time_point, event_type, _, _ = self.__heap[0]
+        return time_point, event_type
+
+    def pop(self) -> tuple:
+        time_point, event_type, _, payload = heapq.heappop(self.__heap)
+        return time_point, event_type, payload
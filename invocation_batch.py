@@ -0,0 +1,115 @@
+from collections import deque
+from typing import Iterable, Iterator
+
+import numpy as np
+
+from simulated_concept import Invocation, SimulatedApplication, SimulatedFunction
+
+
+class InvocationBatch:
+    def __init__(
+        self,
+        functions: list[SimulatedFunction],
+        applications: list[SimulatedApplication],
+        fun_indices: np.ndarray,
+        app_indices: np.ndarray,
+        arrival_times: np.ndarray,
+        remain_times: np.ndarray,
+        memories: np.ndarray,
+    ):
+        # one row per invocation, Invocation objects are only created on access
+        assert (
+            fun_indices.shape
+            == app_indices.shape
+            == arrival_times.shape
+            == remain_times.shape
+            == memories.shape
+        )
+        self.__functions = functions
+        self.__applications = applications
+        self.fun_indices = fun_indices
+        self.app_indices = app_indices
+        self.arrival_times = arrival_times
+        self.remain_times = remain_times
+        self.memories = memories
+
+    def __len__(self) -> int:
+        return self.fun_indices.shape[0]
+
+    def __repr__(self) -> str:
+        return f"InvocationBatch({len(self)})"
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return InvocationBatch(
+                functions=self.__functions,
+                applications=self.__applications,
+                fun_indices=self.fun_indices[key],
+                app_indices=self.app_indices[key],
+                arrival_times=self.arrival_times[key],
+                remain_times=self.remain_times[key],
+                memories=self.memories[key],
+            )
+        invocation = Invocation(
+            fun=self.__functions[self.fun_indices[key]],
+            app=self.__applications[self.app_indices[key]],
+        )
+        invocation.invoke_time = int(self.arrival_times[key])
+        invocation.set_exec_time(int(self.remain_times[key]))
+        return invocation
+
+    def __iter__(self) -> Iterator[Invocation]:
+        for idx in range(len(self)):
+            yield self[idx]
+
+    def split(self, time_points: Iterable[int]) -> list["InvocationBatch"]:
+        # cut the batch before each time point, arrival times must be sorted
+        boundaries = np.searchsorted(
+            self.arrival_times, np.asarray(list(time_points)), side="left"
+        ).tolist()
+        batches = []
+        start = 0
+        for end in boundaries + [len(self)]:
+            batches.append(self[start:end])
+            start = end
+        return batches
+
+
+class InvocationQueue:
+    def __init__(self):
+        # pending segments with their memory column, popped in arrival order
+        self.__segments: deque[
+            tuple[InvocationBatch | list[Invocation], list[int]]
+        ] = deque()
+        self.__head: int = 0
+        self.__size: int = 0
+
+    def __len__(self) -> int:
+        return self.__size
+
+    def append(self, invocation: Invocation) -> None:
+        self.extend([invocation])
+
+    def extend(self, invocations: InvocationBatch | Iterable[Invocation]) -> None:
+        if isinstance(invocations, InvocationBatch):
+            memories = invocations.memories.tolist()
+        else:
+            invocations = list(invocations)
+            memories = [invocation.memory for invocation in invocations]
+        if not memories:
+            return
+        self.__segments.append((invocations, memories))
+        self.__size += len(memories)
+
+    def peek_memory(self) -> int:
+        return self.__segments[0][1][self.__head]
+
+    def popleft(self) -> Invocation:
+        invocations, memories = self.__segments[0]
+        invocation = invocations[self.__head]
+        self.__head += 1
+        self.__size -= 1
+        if self.__head == len(memories):
+            self.__segments.popleft()
+            self.__head = 0
+        return invocation
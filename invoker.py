@@ -1,15 +1,17 @@
-import copy
 from datetime import timedelta
+from typing import Callable
 
 from cache_policy import get_cache_policy
-from clock import VirtualClock
+from clock import VirtualClock, to_ticks
 from config import global_config
+from container_cache import ContainerCache
 from job_scheduler import Scheduler, get_scheduler
+from metrics import MetricsRecorder
 from simulated_concept import Container, Invocation
 
 
 class Invoker:
-    time_slice = timedelta(milliseconds=10)
+    time_slice: int = to_ticks(timedelta(milliseconds=10))
     __next_id: int = 0
 
     def __init__(self, memory, cores):
@@ -18,24 +20,70 @@ class Invoker:
         self._total_memory = memory
         self._free_memory = memory
         self.__cores = cores
-        self.__slowdown = []
+        self.__metrics = MetricsRecorder()
         self._scheduler: Scheduler = get_scheduler(
             name=global_config["scheduler_type"], cores=cores
         )
         self.__clock = VirtualClock()
+        self.__new_job_callback: Callable | None = None
+        self.__cluster_state = None
+        self.__cluster_index: int = 0
 
     def has_job(self) -> bool:
         return self._scheduler.has_job()
 
     @property
-    def slowdown(self) -> list:
-        return self.__slowdown
+    def metrics(self) -> MetricsRecorder:
+        return self.__metrics
+
+    @property
+    def scheduler(self) -> Scheduler:
+        return self._scheduler
+
+    def set_scheduler(self, scheduler: Scheduler) -> None:
+        assert not self._scheduler.has_job()
+        self._scheduler = scheduler
+
+    @property
+    def memory(self) -> int:
+        return self._total_memory
+
+    @property
+    def cores(self) -> int:
+        return self.__cores
+
+    @property
+    def job_number(self) -> int:
+        return self._scheduler.job_number()
 
     @property
     def load(self) -> float:
         return self._scheduler.job_number() / self.__cores
 
-    def add_new_job(self, invocation: Invocation, clock: VirtualClock, cache_idx=None):
+    def set_new_job_callback(self, callback: Callable | None) -> None:
+        self.__new_job_callback = callback
+
+    def set_cluster_state(self, cluster_state, index: int) -> None:
+        self.__cluster_state = cluster_state
+        self.__cluster_index = index
+
+    def add_new_job(
+        self, invocation: Invocation, clock: VirtualClock, cached_container=None
+    ):
+        self.advance_to(global_clock=clock)
+        self._add_new_job(
+            invocation=invocation, clock=clock, cached_container=cached_container
+        )
+        if self.__cluster_state is not None:
+            self.__cluster_state.add_job(
+                index=self.__cluster_index, memory=invocation.app.memory
+            )
+        if self.__new_job_callback is not None:
+            self.__new_job_callback()
+
+    def _add_new_job(
+        self, invocation: Invocation, clock: VirtualClock, cached_container=None
+    ):
         self._scheduler.add_job(Container(invocation=invocation, clock=clock))
         self._free_memory -= invocation.app.memory
 
@@ -47,17 +95,33 @@ class Invoker:
         }
 
     def sync_local_clock(self, global_clock: VirtualClock):
-        assert self.__clock.time_point <= global_clock.time_point
-        self.__clock = copy.deepcopy(global_clock)
+        assert self.__clock.ticks <= global_clock.ticks
+        self.__clock.set_ticks(global_clock.ticks)
+
+    def advance_to(self, global_clock: VirtualClock) -> None:
+        # run the pending jobs up to the global time point before touching the job set
+        if self.__clock.ticks < global_clock.ticks:
+            self.run(time_duration=global_clock.ticks - self.__clock.ticks)
+            self.sync_local_clock(global_clock=global_clock)
 
-    def run(self, time_duration: timedelta):
+    def next_state_change(self) -> int:
+        return self._scheduler.next_state_change(time_slice=self.time_slice)
+
+    def next_event_time(self) -> int | None:
+        if not self._scheduler.has_job():
+            return None
+        return self.__clock.ticks + self.next_state_change()
+
+    def run(self, time_duration: int):
         assert self._scheduler is not None
-        number_of_time_slice = int(time_duration / self.time_slice)
-        for _ in range(number_of_time_slice):
+        while time_duration:
             if not self._scheduler.has_job():
                 return
+            # jump to the next completion or preemption point in one call
+            time_slice = min(self.next_state_change(), time_duration)
+            time_duration -= time_slice
             finished_containers = self._scheduler(
-                time_slice=self.time_slice,
+                time_slice=time_slice,
                 clock=self.__clock,
             )
             if finished_containers:
@@ -65,41 +129,83 @@ class Invoker:
                 if not self.has_job:
                     assert self._total_memory == self._free_memory
 
+    def finish_remote_jobs(self, completions: list[tuple[int, int]]) -> None:
+        # (container id, finish time) of jobs run by a shard process
+        self._process_finished_container(
+            [
+                self._scheduler.finish_job(
+                    container_id=container_id, finish_time=finish_time
+                )
+                for container_id, finish_time in completions
+            ]
+        )
+
     def _process_finished_container(self, finished_containers):
         for container in finished_containers:
             self._free_memory += container.memory
-            self.__slowdown.append(container.invocation.slowdown)
+            self.__metrics.add(container.invocation)
+            if self.__cluster_state is not None:
+                self.__cluster_state.finish_job(
+                    index=self.__cluster_index, memory=container.memory
+                )
 
 
 class CacheInvoker(Invoker):
     def __init__(self, memory, cores):
         super().__init__(memory=memory, cores=cores)
-        self.__cache: list[Container] = []
+        self.__cache = ContainerCache()
         self.__cache_policy = get_cache_policy(name=global_config["cache_policy"])
 
+    def set_cluster_state(self, cluster_state, index: int) -> None:
+        super().set_cluster_state(cluster_state=cluster_state, index=index)
+        self.__cache.set_cluster_state(cluster_state=cluster_state, index=index)
+
+    def next_event_time(self) -> int | None:
+        event_time = super().next_event_time()
+        expiration = self.__cache_policy.next_expiration()
+        if expiration is None:
+            return event_time
+        if event_time is None:
+            return expiration
+        return min(event_time, expiration)
+
+    def sync_local_clock(self, global_clock: VirtualClock):
+        super().sync_local_clock(global_clock=global_clock)
+        self.__cache_policy.expire(cache=self.__cache, clock=global_clock)
+
+    def advance_to(self, global_clock: VirtualClock) -> None:
+        super().advance_to(global_clock=global_clock)
+        self.__cache_policy.expire(cache=self.__cache, clock=global_clock)
+
+    @property
+    def cache(self) -> ContainerCache:
+        return self.__cache
+
     @property
     def free_memory_without_cache(self):
-        return self._free_memory - sum(
-            (invocation.app.memory for invocation in self.__cache), start=0
-        )
+        return self._free_memory - self.__cache.memory
 
     def get_performance_stat(self) -> dict:
         return super().get_performance_stat() | {
             "cache": self.__cache,
+            "cached_memory": self.__cache.memory,
         }
 
-    def add_new_job(self, invocation: Invocation, clock: VirtualClock, cache_idx=None):
-        if cache_idx is not None:
-            container = self.__cache.pop(cache_idx)
-            container.load_invocation(invocation, clock=clock)
-            self._scheduler.add_job(container=container)
+    def _add_new_job(
+        self, invocation: Invocation, clock: VirtualClock, cached_container=None
+    ):
+        if cached_container is not None:
+            self.__cache_policy.reuse_container(
+                cache=self.__cache, container=cached_container, clock=clock
+            )
+            cached_container.load_invocation(invocation, clock=clock)
+            self._scheduler.add_job(container=cached_container)
             self._free_memory -= invocation.app.memory
         else:
             self._scheduler.add_job(Container(invocation=invocation, clock=clock))
             self._free_memory -= invocation.app.memory
             free_memory_without_cache = self.free_memory_without_cache
             if free_memory_without_cache < 0:
-                print("perform evict")
                 self.__cache_policy.evict(
                     self.__cache,
                     lambda released_memory: free_memory_without_cache + released_memory
@@ -107,35 +213,8 @@ class CacheInvoker(Invoker):
                 )
                 assert self.free_memory_without_cache >= 0
 
-    @classmethod
-    def get_cache(
-        cls, cache: list[Invocation], invocation: Invocation
-    ) -> tuple[int, int]:
-        min_memory = None
-        cache_idx = None
-        cache_level: int = 3
-        for idx, cached_container in enumerate(cache):
-            if cached_container.fun_id == invocation.fun.id:
-                cache_level = 0
-                cache_idx = idx
-                break
-            if cache_level == 1:
-                continue
-            if invocation.app.id == cached_container.app_id:
-                cache_level = 1
-                cache_idx = idx
-                continue
-
-            if invocation.memory <= cached_container.memory and (
-                min_memory is None or cached_container.memory < min_memory
-            ):
-                cache_idx = idx
-                cache_level = 2
-                min_memory = cached_container.memory
-        if cache_level == 3 and cache:
-            print("cache miss", cache)
-            raise RuntimeError("fdfds")
-        return cache_idx, cache_level
+    def get_cache(self, invocation: Invocation) -> tuple[Container | None, int]:
+        return self.__cache.lookup(invocation)
 
     def _process_finished_container(self, finished_containers):
         super()._process_finished_container(finished_containers)
@@ -1,7 +1,8 @@
 import heapq
-from datetime import timedelta
+import itertools
+from typing import Iterable
 
-from scipy.stats import bernoulli
+import numpy as np
 
 from clock import VirtualClock
 from simulated_concept import Container
@@ -13,7 +14,7 @@ class Scheduler:
         self._cores = cores
 
     def __call__(
-        self, cores: int, time_slice: timedelta, clock: VirtualClock
+        self, cores: int, time_slice: int, clock: VirtualClock
     ) -> list[Container]:
         raise NotImplementedError()
 
@@ -26,9 +27,19 @@ class Scheduler:
     def add_job(self, container: Container) -> None:
         self._jobs.append(container)
 
+    def next_state_change(self, time_slice: int) -> int:
+        # with more jobs than cores the batch is rebuilt every time slice,
+        # otherwise all jobs run until the first one completes
+        if self.job_number() > self._cores:
+            return time_slice
+        return min(container.invocation.remain_time for container in self._containers())
+
+    def _containers(self) -> Iterable[Container]:
+        return self._jobs
+
     def _run_batch(
-        self, batch: list[Container], time_slice: timedelta, clock: VirtualClock
-    ) -> timedelta:
+        self, batch: list[Container], time_slice: int, clock: VirtualClock
+    ) -> int:
         assert batch
         min_remain_time = min(container.invocation.remain_time for container in batch)
         min_remain_time = min(min_remain_time, time_slice)
@@ -40,9 +51,14 @@ class Scheduler:
 
 
 class FIFOScheduler(Scheduler):
+    def next_state_change(self, time_slice: int) -> int:
+        return min(
+            container.invocation.remain_time for container in self._jobs[: self._cores]
+        )
+
     def __call__(
         self,
-        time_slice: timedelta,
+        time_slice: int,
         clock: VirtualClock,
     ) -> list[Container]:
         completed_jobs: list[Container] = []
@@ -61,7 +77,7 @@ class FIFOScheduler(Scheduler):
 class RRScheduler(Scheduler):
     def __call__(
         self,
-        time_slice: timedelta,
+        time_slice: int,
         clock: VirtualClock,
     ) -> list[Container]:
         completed_jobs: list[Container] = []
@@ -88,9 +104,12 @@ class LASScheduler(Scheduler):
             (container.invocation.used_time, container),
         )
 
+    def _containers(self) -> Iterable[Container]:
+        return (job[1] for job in self._jobs)
+
     def __call__(
         self,
-        time_slice: timedelta,
+        time_slice: int,
         clock: VirtualClock,
     ) -> list[Container]:
         completed_jobs: list[Container] = []
@@ -118,9 +137,13 @@ class SRTFScheduler(Scheduler):
             (container.invocation.remain_time, container),
         )
 
+    def next_state_change(self, time_slice: int) -> int:
+        # the running batch keeps the shortest remaining times until one completes
+        return self._jobs[0][0]
+
     def __call__(
         self,
-        time_slice: timedelta,
+        time_slice: int,
         clock: VirtualClock,
     ) -> tuple[list[Container], list[Container]]:
         completed_jobs: list[Container] = []
@@ -142,16 +165,16 @@ class SRTFScheduler(Scheduler):
 
 
 class LotterySRTFScheduler(Scheduler):
-    known_job_IDs: set[str] = set()
+    known_job_IDs: set[int] = set()
     max_prob = 9 / 10
 
     def __init__(self, cores):
         super().__init__(cores=cores)
         self.__SRTF = None
         self.__LAS = None
-        self._known_jobs = {}
-        self._unknown_jobs = {}
-        self._unknown_fun_ids = {}
+        self._known_jobs: dict[int, Container] = {}
+        self._unknown_jobs: dict[int, Container] = {}
+        self._unknown_fun_ids: dict[int, list[Container]] = {}
 
     def add_job(self, container: Container) -> None:
         is_known_job = False
@@ -172,9 +195,12 @@ class LotterySRTFScheduler(Scheduler):
     def job_number(self) -> int:
         return len(self._known_jobs) + len(self._unknown_jobs)
 
+    def _containers(self) -> Iterable[Container]:
+        return itertools.chain(self._known_jobs.values(), self._unknown_jobs.values())
+
     def __call__(
         self,
-        time_slice: timedelta,
+        time_slice: int,
         clock: VirtualClock,
     ) -> tuple[list[Container], list[Container]]:
         already_known_jobs = LotterySRTFScheduler.known_job_IDs.intersection(
@@ -196,7 +222,7 @@ class LotterySRTFScheduler(Scheduler):
             use_SRTF = False
         else:
             p = min(self.max_prob, len(self._known_jobs) / self.job_number())
-            use_SRTF = bernoulli.rvs(p=p, size=1).tolist()[0]
+            use_SRTF = np.random.binomial(1, p, size=1).tolist()[0]
             if use_SRTF and len(self._known_jobs) < self._cores:
                 use_SRTF = False
                 use_SRTF_completed_with_LAS = True
@@ -0,0 +1,142 @@
+import math
+
+from clock import TICKS_PER_SECOND
+from simulated_concept import Invocation
+
+quantiles = {"p50": 0.5, "p90": 0.9, "p99": 0.99, "p99.9": 0.999}
+
+
+class LogHistogram:
+    def __init__(self, relative_accuracy: float = 0.01, max_bin_number: int = 2048):
+        # bin i counts the values in (gamma^(i-1), gamma^i], so a quantile is
+        # reported within the relative accuracy of the recorded value
+        assert 0 < relative_accuracy < 1
+        self.relative_accuracy = relative_accuracy
+        self.max_bin_number = max_bin_number
+        self.__gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.__log_gamma = math.log(self.__gamma)
+        self.__bins: dict[int, int] = {}
+        self.__zero_count: int = 0
+        self.__count: int = 0
+        self.__sum: float = 0
+        self.__min: float = math.inf
+        self.__max: float = -math.inf
+
+    def __len__(self) -> int:
+        return self.__count
+
+    @property
+    def mean(self) -> float:
+        return self.__sum / self.__count
+
+    @property
+    def min(self) -> float:
+        return self.__min
+
+    @property
+    def max(self) -> float:
+        return self.__max
+
+    def add(self, value: float) -> None:
+        self.__count += 1
+        self.__sum += value
+        self.__min = min(self.__min, value)
+        self.__max = max(self.__max, value)
+        if value <= 0:
+            self.__zero_count += 1
+            return
+        key = math.ceil(math.log(value) / self.__log_gamma)
+        self.__bins[key] = self.__bins.get(key, 0) + 1
+        if len(self.__bins) > self.max_bin_number:
+            self.__collapse()
+
+    def merge(self, other: "LogHistogram") -> None:
+        assert self.relative_accuracy == other.relative_accuracy
+        for key, count in other.__bins.items():
+            self.__bins[key] = self.__bins.get(key, 0) + count
+        self.__zero_count += other.__zero_count
+        self.__count += other.__count
+        self.__sum += other.__sum
+        self.__min = min(self.__min, other.__min)
+        self.__max = max(self.__max, other.__max)
+        if len(self.__bins) > self.max_bin_number:
+            self.__collapse()
+
+    def quantile(self, q: float) -> float:
+        assert self.__count
+        rank = q * (self.__count - 1)
+        if rank < self.__zero_count:
+            return self.__min
+        accumulated = self.__zero_count
+        for key in sorted(self.__bins):
+            accumulated += self.__bins[key]
+            if accumulated > rank:
+                value = 2 * self.__gamma**key / (self.__gamma + 1)
+                return min(max(value, self.__min), self.__max)
+        return self.__max
+
+    def __collapse(self) -> None:
+        # the lowest bins are merged, which keeps the upper quantiles accurate
+        keys = sorted(self.__bins)
+        overflow = keys[: len(keys) - self.max_bin_number + 1]
+        self.__bins[overflow[-1]] = sum(self.__bins.pop(key) for key in overflow)
+
+
+class InvocationMetrics:
+    def __init__(self):
+        self.slowdown = LogHistogram()
+        # seconds from the arrival to the completion
+        self.latency = LogHistogram()
+
+    def __len__(self) -> int:
+        return len(self.slowdown)
+
+    def add(self, invocation: Invocation) -> None:
+        self.slowdown.add(invocation.slowdown)
+        self.latency.add(
+            (invocation.finish_time - invocation.invoke_time) / TICKS_PER_SECOND
+        )
+
+    def merge(self, other: "InvocationMetrics") -> None:
+        self.slowdown.merge(other.slowdown)
+        self.latency.merge(other.latency)
+
+    def summary(self) -> dict:
+        result: dict = {"invocation_number": len(self)}
+        if not len(self):
+            return result
+        for name, sketch in (("slowdown", self.slowdown), ("latency", self.latency)):
+            result[f"{name}_mean"] = sketch.mean
+            for quantile_name, q in quantiles.items():
+                result[f"{name}_{quantile_name}"] = sketch.quantile(q)
+            result[f"{name}_max"] = sketch.max
+        return result
+
+
+class MetricsRecorder:
+    def __init__(self):
+        # the sketches of all completions, and grouped by function and cache level
+        self.total = InvocationMetrics()
+        self.functions: dict[int, InvocationMetrics] = {}
+        self.cache_levels: dict[int, InvocationMetrics] = {}
+
+    def add(self, invocation: Invocation) -> None:
+        self.total.add(invocation)
+        fun_id = invocation.fun.id
+        if fun_id not in self.functions:
+            self.functions[fun_id] = InvocationMetrics()
+        self.functions[fun_id].add(invocation)
+        if invocation.cache_level not in self.cache_levels:
+            self.cache_levels[invocation.cache_level] = InvocationMetrics()
+        self.cache_levels[invocation.cache_level].add(invocation)
+
+    def merge(self, other: "MetricsRecorder") -> None:
+        self.total.merge(other.total)
+        for groups, other_groups in (
+            (self.functions, other.functions),
+            (self.cache_levels, other.cache_levels),
+        ):
+            for key, metrics in other_groups.items():
+                if key not in groups:
+                    groups[key] = InvocationMetrics()
+                groups[key].merge(metrics)
@@ -0,0 +1,120 @@
+import functools
+import inspect
+import time
+from typing import Callable
+
+from cache_policy import CachePolicy
+from controller import CacheAwareController, Controller
+from job_scheduler import Scheduler
+from sharded_fleet import ShardedInvokerFleet
+from workload import Workload
+
+
+def __count_one(result) -> int:
+    return 1
+
+
+def __count_len(result) -> int:
+    return len(result)
+
+
+# (class, method, items processed by a call), overrides in subclasses are
+# timed too and the times of nested calls are included in their callers
+targets: list[tuple[type, str, Callable]] = [
+    (Controller, "route_batch", int),
+    (Controller, "route_invocation", int),
+    (CacheAwareController, "decide_invoker", __count_one),
+    (Scheduler, "__call__", __count_len),
+    (CachePolicy, "evict", __count_len),
+    (CachePolicy, "expire", __count_len),
+    (Workload, "stream_arrivals", __count_len),
+    (Workload, "_invocation_rates", __count_len),
+    (ShardedInvokerFleet, "run", __count_one),
+]
+
+
+class Profiler:
+    def __init__(self):
+        # the methods are only wrapped inside the context, so a disabled profiler
+        # leaves the classes untouched
+        self.__stats: dict[str, list[int]] = {}
+        self.__originals: list[tuple[type, str, Callable]] = []
+
+    def __enter__(self) -> "Profiler":
+        for cls, method_name, count_items in targets:
+            for target_cls in [cls] + self.__subclasses(cls):
+                if method_name in vars(target_cls):
+                    self.__wrap(target_cls, method_name, count_items)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        for cls, method_name, method in reversed(self.__originals):
+            setattr(cls, method_name, method)
+        self.__originals.clear()
+
+    @property
+    def stats(self) -> dict[str, list[int]]:
+        # name -> [calls, nanoseconds, items]
+        return self.__stats
+
+    def print_breakdown(self) -> None:
+        print(
+            f"{'method':<45}{'calls':>10}{'seconds':>10}{'us/call':>10}{'items':>12}"
+        )
+        for name, (calls, elapsed, items) in sorted(
+            self.__stats.items(), key=lambda item: -item[1][1]
+        ):
+            if not calls:
+                continue
+            print(
+                f"{name:<45}{calls:>10}{elapsed / 1e9:>10.3f}"
+                f"{elapsed / calls / 1e3:>10.2f}{items:>12}"
+            )
+
+    @classmethod
+    def __subclasses(cls, base: type) -> list[type]:
+        subclasses = []
+        for subclass in base.__subclasses__():
+            subclasses += [subclass] + cls.__subclasses(subclass)
+        return subclasses
+
+    def __wrap(self, cls: type, method_name: str, count_items: Callable) -> None:
+        if any(
+            original_cls is cls and name == method_name
+            for original_cls, name, _ in self.__originals
+        ):
+            return
+        method = vars(cls)[method_name]
+        stat = self.__stats.setdefault(f"{cls.__name__}.{method_name}", [0, 0, 0])
+
+        if inspect.isgeneratorfunction(method):
+            # each step of a generator is a call
+
+            @functools.wraps(method)
+            def wrapper(*args, **kwargs):
+                iterator = method(*args, **kwargs)
+                while True:
+                    start = time.perf_counter_ns()
+                    try:
+                        item = next(iterator)
+                    except StopIteration:
+                        stat[1] += time.perf_counter_ns() - start
+                        return
+                    stat[0] += 1
+                    stat[1] += time.perf_counter_ns() - start
+                    stat[2] += count_items(item)
+                    yield item
+
+        else:
+
+            @functools.wraps(method)
+            def wrapper(*args, **kwargs):
+                start = time.perf_counter_ns()
+                result = method(*args, **kwargs)
+                stat[0] += 1
+                stat[1] += time.perf_counter_ns() - start
+                stat[2] += count_items(result)
+                return result
+
+        self.__originals.append((cls, method_name, method))
+        setattr(cls, method_name, wrapper)
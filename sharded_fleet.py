@@ -0,0 +1,290 @@
+import itertools
+import multiprocessing
+from typing import Iterable
+
+import numpy as np
+
+from clock import VirtualClock
+from config import global_config
+from invoker import Invoker
+from job_scheduler import LotterySRTFScheduler, Scheduler
+from simulated_concept import Container, Invocation
+from workload import Workload
+
+
+class RemoteScheduler(Scheduler):
+    def __init__(self, cores: int, index: int, outbox: list):
+        # the jobs run in a shard process, only their containers are kept here
+        super().__init__(cores=cores)
+        self.__index = index
+        self.__outbox = outbox
+        self.__running_jobs: dict[int, Container] = {}
+
+    def __call__(self, time_slice: int, clock: VirtualClock) -> list[Container]:
+        raise RuntimeError("remote jobs only run in their shard process")
+
+    def job_number(self) -> int:
+        return len(self.__running_jobs)
+
+    def add_job(self, container: Container) -> None:
+        self.__running_jobs[container.id] = container
+        self.__outbox.append((self.__index, container))
+
+    def next_state_change(self, time_slice: int) -> int:
+        raise RuntimeError("remote jobs only run in their shard process")
+
+    def _containers(self) -> Iterable[Container]:
+        return self.__running_jobs.values()
+
+    def finish_job(self, container_id: int, finish_time: int) -> Container:
+        container = self.__running_jobs.pop(container_id)
+        container.invocation.finish(finish_time)
+        return container
+
+
+class ShardInvoker(Invoker):
+    def __init__(self, memory, cores):
+        # runs the jobs of one invoker, the controller process keeps its memory
+        # and cache state
+        super().__init__(memory=memory, cores=cores)
+        self.finished_containers: list[Container] = []
+
+    def add_container(self, container: Container) -> None:
+        self._scheduler.add_job(container)
+
+    def _process_finished_container(self, finished_containers):
+        self.finished_containers += finished_containers
+
+
+class ShardedInvokerFleet:
+    # invoker index, container id, function id, application id, invoke time,
+    # remain time
+    dispatch_columns = 6
+    # invoker index, container id, finish time
+    completion_columns = 3
+    # the key, position and gaussian flag of the legacy MT19937 state
+    random_state_size = 624 + 2
+
+    def __init__(self, invokers: list[Invoker], workload: Workload, shard_number: int):
+        self.__invokers = invokers
+        self.__functions = {fun.id: fun for fun in workload.functions}
+        self.__applications = {app.id: app for app in workload.applications}
+        shard_number = max(1, min(shard_number, len(invokers)))
+        self.__shards: list[list[int]] = [
+            shard.tolist()
+            for shard in np.array_split(np.arange(len(invokers)), shard_number)
+        ]
+        # every running job holds the memory of its application, which bounds
+        # both the jobs dispatched and the jobs completed in a step
+        min_memory = max(1, min(app.memory for app in workload.applications))
+        self.__capacities = [
+            sum(invokers[idx].memory // min_memory for idx in shard)
+            for shard in self.__shards
+        ]
+        self.__offsets = [0] + list(itertools.accumulate(self.__capacities))
+        context = multiprocessing.get_context("fork")
+        # step duration, dispatch number, learned functions before and during the
+        # step, and the completion number of each shard
+        self.__control = np.frombuffer(
+            context.RawArray("q", 4 + shard_number), dtype=np.int64
+        )
+        self.__dispatches = np.frombuffer(
+            context.RawArray("q", self.__offsets[-1] * self.dispatch_columns),
+            dtype=np.int64,
+        ).reshape(-1, self.dispatch_columns)
+        self.__completions = np.frombuffer(
+            context.RawArray("q", self.__offsets[-1] * self.completion_columns),
+            dtype=np.int64,
+        ).reshape(-1, self.completion_columns)
+        self.__barrier = context.Barrier(shard_number + 1)
+        # the functions learned by LotterySRTF are shared by all invokers and the
+        # lottery draws from the global random state, so the shards run their
+        # invokers in turn, in invoker order like the tick engine, and hand the
+        # learned functions and the random state on in shared memory
+        self.__lottery = global_config["scheduler_type"] == "LotterySRTF"
+        self.__learned_functions = np.frombuffer(
+            context.RawArray("q", len(self.__functions)), dtype=np.int64
+        )
+        self.__learned_number: int = 0
+        self.__random_state = np.frombuffer(
+            context.RawArray("q", self.random_state_size), dtype=np.int64
+        )
+        self.__cached_gaussian = np.frombuffer(context.RawArray("d", 1))
+        self.__turns = [context.Semaphore(0) for _ in range(shard_number)]
+        self.__processes = [
+            context.Process(target=self.__serve, args=(shard_idx,), daemon=True)
+            for shard_idx in range(shard_number)
+        ]
+        self.__outbox: list[tuple[int, Container]] = []
+
+    def __enter__(self) -> "ShardedInvokerFleet":
+        # the shards fork with idle invokers, which then only forward their jobs
+        for process in self.__processes:
+            process.start()
+        for index, invoker in enumerate(self.__invokers):
+            invoker.set_scheduler(
+                RemoteScheduler(cores=invoker.cores, index=index, outbox=self.__outbox)
+            )
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        if exc_type is None:
+            self.__control[0] = 0
+            self.__barrier.wait()
+        else:
+            self.__barrier.abort()
+        for process in self.__processes:
+            process.join()
+
+    def run(self, time_duration: int) -> None:
+        assert time_duration > 0
+        dispatch_number = len(self.__outbox)
+        if dispatch_number:
+            self.__dispatches[:dispatch_number] = [
+                (
+                    index,
+                    container.id,
+                    container.fun_id,
+                    container.app_id,
+                    container.invocation.invoke_time,
+                    container.invocation.remain_time,
+                )
+                for index, container in self.__outbox
+            ]
+            self.__outbox.clear()
+        for shard, capacity in zip(self.__shards, self.__capacities):
+            if sum(self.__invokers[idx].job_number for idx in shard) > capacity:
+                raise RuntimeError("running jobs exceed the shard capacity", capacity)
+        self.__control[0] = time_duration
+        self.__control[1] = dispatch_number
+        if self.__lottery:
+            self.__control[2] = self.__control[3]
+            self.__save_random_state()
+            self.__turns[0].release()
+        # one barrier releases the shards, the next one waits for their completions
+        self.__barrier.wait()
+        self.__barrier.wait()
+        if self.__lottery:
+            self.__load_random_state()
+            self.__learned_number = self.__learn(
+                self.__learned_number, int(self.__control[3])
+            )
+        for shard_idx, offset in enumerate(self.__offsets[:-1]):
+            completion_number = int(self.__control[4 + shard_idx])
+            rows = self.__completions[offset : offset + completion_number].tolist()
+            # rows are grouped by invoker and kept in their finish order
+            for index, group in itertools.groupby(rows, key=lambda row: row[0]):
+                self.__invokers[index].finish_remote_jobs(
+                    [
+                        (container_id, finish_time)
+                        for _, container_id, finish_time in group
+                    ]
+                )
+
+    def __serve(self, shard_idx: int) -> None:
+        shard = self.__shards[shard_idx]
+        invokers = {
+            idx: ShardInvoker(
+                memory=self.__invokers[idx].memory, cores=self.__invokers[idx].cores
+            )
+            for idx in shard
+        }
+        offset = self.__offsets[shard_idx]
+        clock = VirtualClock()
+        learned_number = 0
+        try:
+            while True:
+                self.__barrier.wait()
+                time_duration = int(self.__control[0])
+                if time_duration == 0:
+                    return
+                if self.__lottery:
+                    # the jobs were routed with the functions learned before the step
+                    self.__turns[shard_idx].acquire()
+                    learned_number = self.__learn(
+                        learned_number, int(self.__control[2])
+                    )
+                dispatches = self.__dispatches[: self.__control[1]]
+                dispatches = dispatches[
+                    (dispatches[:, 0] >= shard[0]) & (dispatches[:, 0] <= shard[-1])
+                ]
+                for (
+                    index,
+                    container_id,
+                    fun_id,
+                    app_id,
+                    invoke_time,
+                    remain_time,
+                ) in dispatches.tolist():
+                    invocation = Invocation(
+                        fun=self.__functions[fun_id], app=self.__applications[app_id]
+                    )
+                    invocation.invoke_time = invoke_time
+                    invocation.set_exec_time(remain_time)
+                    container = Container(invocation=invocation, clock=clock)
+                    # schedulers break ties by container id, keep the controller's one
+                    container.id = container_id
+                    invokers[index].add_container(container)
+                if self.__lottery:
+                    # and run with the functions learned by the preceding invokers
+                    learned_number = self.__learn(
+                        learned_number, int(self.__control[3])
+                    )
+                    self.__load_random_state()
+                    known_job_IDs = set(LotterySRTFScheduler.known_job_IDs)
+                clock.advance(time_duration)
+                rows = []
+                for index, invoker in invokers.items():
+                    invoker.run(time_duration=time_duration)
+                    invoker.sync_local_clock(global_clock=clock)
+                    rows += [
+                        (index, container.id, container.invocation.finish_time)
+                        for container in invoker.finished_containers
+                    ]
+                    invoker.finished_containers.clear()
+                if rows:
+                    self.__completions[offset : offset + len(rows)] = rows
+                self.__control[4 + shard_idx] = len(rows)
+                if self.__lottery:
+                    learned_functions = sorted(
+                        LotterySRTFScheduler.known_job_IDs - known_job_IDs
+                    )
+                    self.__learned_functions[
+                        learned_number : learned_number + len(learned_functions)
+                    ] = learned_functions
+                    learned_number += len(learned_functions)
+                    self.__control[3] = learned_number
+                    self.__save_random_state()
+                    if shard_idx + 1 < len(self.__turns):
+                        self.__turns[shard_idx + 1].release()
+                self.__barrier.wait()
+        except BaseException:
+            self.__barrier.abort()
+            # don't leave the following shards waiting for their turn
+            for turn in self.__turns:
+                turn.release()
+            raise
+
+    def __learn(self, learned_number: int, new_learned_number: int) -> int:
+        LotterySRTFScheduler.known_job_IDs.update(
+            self.__learned_functions[learned_number:new_learned_number].tolist()
+        )
+        return new_learned_number
+
+    def __save_random_state(self) -> None:
+        _, key, pos, has_gauss, cached_gaussian = np.random.get_state()
+        self.__random_state[:-2] = key
+        self.__random_state[-2] = pos
+        self.__random_state[-1] = has_gauss
+        self.__cached_gaussian[0] = cached_gaussian
+
+    def __load_random_state(self) -> None:
+        np.random.set_state(
+            (
+                "MT19937",
+                self.__random_state[:-2].astype(np.uint32),
+                int(self.__random_state[-2]),
+                int(self.__random_state[-1]),
+                float(self.__cached_gaussian[0]),
+            )
+        )
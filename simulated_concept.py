@@ -1,81 +1,124 @@
 import random
 from datetime import timedelta
 
-from clock import VirtualClock
+from clock import VirtualClock, to_ticks
 
 
 class SimulatedFunction:
+    __slots__ = (
+        "id",
+        "__exec_time",
+        "__container_init_time",
+        "__app_init_time",
+        "__fun_init_time",
+        "__total_cost",
+    )
     __next_id: int = 0
 
     def __init__(self, exec_time: timedelta):
-        self.id = f"fun_{SimulatedFunction.__next_id}"
-        self.__exec_time: timedelta = exec_time
+        self.id: int = SimulatedFunction.__next_id
+        # all costs are kept in clock ticks
+        self.__exec_time: int = to_ticks(exec_time)
         # add container startup time
-        self.__container_init_time = timedelta(milliseconds=random.randint(1000, 1500))
+        self.__container_init_time: int = to_ticks(
+            timedelta(milliseconds=random.randint(1000, 1500))
+        )
         exec_time_ms = exec_time / timedelta(milliseconds=1)
-        self.__app_init_time = timedelta(
-            milliseconds=random.randint(
-                int(exec_time_ms * 5 / 100), int(exec_time_ms * 10 / 100)
+        self.__app_init_time: int = to_ticks(
+            timedelta(
+                milliseconds=random.randint(
+                    int(exec_time_ms * 5 / 100), int(exec_time_ms * 10 / 100)
+                )
             )
         )
-        self.__fun_init_time = timedelta(
-            milliseconds=random.randint(
-                int(exec_time_ms * 5 / 100), int(exec_time_ms * 10 / 100)
+        self.__fun_init_time: int = to_ticks(
+            timedelta(
+                milliseconds=random.randint(
+                    int(exec_time_ms * 5 / 100), int(exec_time_ms * 10 / 100)
+                )
             )
         )
+        self.__total_cost: int = (
+            self.__exec_time
+            + self.__container_init_time
+            + self.__app_init_time
+            + self.__fun_init_time
+        )
         SimulatedFunction.__next_id += 1
 
+    def __repr__(self) -> str:
+        return self.name
+
     @property
-    def exec_time(self):
+    def name(self) -> str:
+        return f"fun_{self.id}"
+
+    @property
+    def exec_time(self) -> int:
         return self.__exec_time
 
     @property
-    def container_init_time(self):
+    def container_init_time(self) -> int:
         return self.__container_init_time
 
     @property
-    def app_init_time(self):
+    def app_init_time(self) -> int:
         return self.__app_init_time
 
     @property
-    def fun_init_time(self):
+    def fun_init_time(self) -> int:
         return self.__fun_init_time
 
     @property
-    def total_cost(self):
-        return (
-            self.__exec_time
-            + self.__container_init_time
-            + self.__app_init_time
-            + self.__fun_init_time
-        )
+    def total_cost(self) -> int:
+        return self.__total_cost
 
 
 class SimulatedApplication:
+    __slots__ = ("id", "memory", "functions")
     __next_id: int = 0
 
     def __init__(self, memory):
-        self.id = f"app_{SimulatedApplication.__next_id}"
+        self.id: int = SimulatedApplication.__next_id
         self.memory = memory
         self.functions: list[SimulatedFunction] = []
         SimulatedApplication.__next_id += 1
 
+    def __repr__(self) -> str:
+        return self.name
+
+    @property
+    def name(self) -> str:
+        return f"app_{self.id}"
+
     def add_fun(self, fun: SimulatedFunction) -> None:
         self.functions.append(fun)
 
 
 class Invocation:
+    __slots__ = (
+        "id",
+        "fun",
+        "app",
+        "invoke_time",
+        "finish_time",
+        "cache_level",
+        "__used_time",
+        "__remain_time",
+    )
     __next_id: int = 0
 
     def __init__(self, fun: SimulatedFunction, app: SimulatedApplication):
-        self.id = f"invocation_{Invocation.__next_id}"
+        self.id: int = Invocation.__next_id
         Invocation.__next_id += 1
         self.fun: SimulatedFunction = fun
         self.app: SimulatedApplication = app
-        self.invoke_time: None | timedelta = None
-        self.finish_time: None | timedelta = None
-        self.__used_time: timedelta = timedelta()
-        self.__remain_time: timedelta = fun.total_cost
+        self.invoke_time: None | int = None
+        self.finish_time: None | int = None
+        # 0 warm function, 1 warm application, 2 warm container, 3 cold start
+        self.cache_level: int = 3
+        self.__used_time: int = 0
+        self.__remain_time: int = fun.total_cost
 
     def set_exec_time(self, exec_time: int):
         self.__remain_time = exec_time
@@ -87,11 +130,15 @@ class Invocation:
         return f"{self.fun}_{self.__remain_time}"
 
     @property
-    def used_time(self) -> timedelta:
+    def name(self) -> str:
+        return f"invocation_{self.id}"
+
+    @property
+    def used_time(self) -> int:
         return self.__used_time
 
     @property
-    def remain_time(self) -> timedelta:
+    def remain_time(self) -> int:
         return self.__remain_time
 
     @property
@@ -107,29 +154,36 @@ class Invocation:
         assert self.complete
         return (self.finish_time - self.invoke_time) / self.fun.exec_time
 
-    def run(self, time_slice: timedelta, clock: VirtualClock) -> None:
+    def finish(self, finish_time: int) -> None:
+        # completion computed by another process that ran the invocation
+        assert not self.complete
+        self.finish_time = finish_time
+        self.__used_time += self.__remain_time
+        self.__remain_time = 0
+
+    def run(self, time_slice: int, clock: VirtualClock) -> None:
         assert not self.complete
         assert self.invoke_time is not None
 
         if self.__remain_time <= time_slice:
-            self.finish_time = clock.time_point + self.__remain_time
+            self.finish_time = clock.ticks + self.__remain_time
             self.__used_time += self.__remain_time
-            self.__remain_time -= self.__remain_time
+            self.__remain_time = 0
             return
         self.__remain_time -= time_slice
         self.__used_time += time_slice
 
 
 class Container:
+    __slots__ = ("id", "__use_count", "__reuse_time", "invocation")
     __next_id: int = 0
 
     def __init__(self, invocation: Invocation, clock: VirtualClock):
-        self.id = f"container_{Container.__next_id}"
+        self.id: int = Container.__next_id
         Container.__next_id += 1
         self.__use_count = 1
-        self.__reuse_time = clock.time_point
+        self.__reuse_time: int = clock.ticks
         self.invocation = invocation
-        self.data = {}
 
     def __eq__(self, other):
         return self.id == other.id
@@ -137,19 +191,20 @@ class Container:
     def __lt__(self, other):
         return self.id < other.id
 
+    def __repr__(self) -> str:
+        return self.name
+
+    @property
+    def name(self) -> str:
+        return f"container_{self.id}"
+
     def load_invocation(self, invocation: Invocation, clock: VirtualClock):
         self.invocation = invocation
         self.__use_count += 1
-        self.__reuse_time = clock.time_point
-
-    def set_data(self, key, value):
-        self.data[key] = value
-
-    def get_data(self, key):
-        return self.data[key]
+        self.__reuse_time = clock.ticks
 
     @property
-    def reuse_time(self):
+    def reuse_time(self) -> int:
         return self.__reuse_time
 
     @property
@@ -157,11 +212,11 @@ class Container:
         return self.__use_count
 
     @property
-    def fun_id(self):
+    def fun_id(self) -> int:
         return self.invocation.fun.id
 
     @property
-    def app_id(self):
+    def app_id(self) -> int:
         return self.invocation.app.id
 
     @property
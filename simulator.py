@@ -1,20 +1,48 @@
+import contextlib
+import functools
 import os
-from datetime import timedelta
+from typing import Callable
 
-import numpy as np
-from cyy_naive_lib.reproducible_random_env import ReproducibleRandomEnv
-
-from clock import VirtualClock
+from clock import TICKS_PER_MINUTE, TICKS_PER_SECOND, VirtualClock
 from config import global_config, load_config
 from controller import CacheAwareController, Controller, get_controller
-from dataset.azure_workload import AzureWorkload
+from event_queue import EventQueue, EventType
 from invoker import CacheInvoker, Invoker
+from job_scheduler import LotterySRTFScheduler
+from metrics import MetricsRecorder
+from profiling import Profiler
+from sharded_fleet import ShardedInvokerFleet
+from telemetry import TelemetryRecorder
+from workload import Workload
+
+
+def get_workload(name: str) -> Workload:
+    # backends are imported on use, only the trace backed ones need pandas
+    match name:
+        case "azure":
+            from dataset.azure_workload import AzureWorkload
+
+            return AzureWorkload()
+        case "replay":
+            from dataset.replay_workload import ReplayWorkload
+
+            return ReplayWorkload()
+        case "synthetic":
+            from dataset.synthetic_workload import SyntheticWorkload
+
+            return SyntheticWorkload()
+    raise NotImplementedError()
 
 
 class Simulator:
-    def __init__(self):
+    def __init__(self, workload: Workload | None = None):
         self.__global_clock = VirtualClock()
-        self.__workload = AzureWorkload()
+        # a workload may be shared by simulations, it only hands out new batches
+        if workload is None:
+            workload = get_workload(global_config.get("workload", "azure"))
+        self.__workload: Workload = workload
+        # the learned job knowledge must not leak from a previous simulation
+        LotterySRTFScheduler.known_job_IDs.clear()
         node_config = global_config["invoker"]
         self.__controller: Controller = get_controller(global_config["controller_type"])
         self.__invokers: list[Invoker] = []
@@ -31,57 +59,231 @@ class Simulator:
                     cores=node_config["core"],
                 )
             )
+        self.__controller.register_invokers(invokers=self.__invokers)
+        self.__telemetry: TelemetryRecorder | None = None
+
+    def __record_telemetry(self, second: int) -> None:
+        assert self.__telemetry is not None
+        self.__telemetry.record(
+            second=second,
+            queue_length=self.__controller.queue_length,
+            dispatches=self.__controller.take_dispatch_counts(),
+            cluster_state=self.__controller.cluster_state,
+        )
 
-    def run(self):
-        time_duration = timedelta(seconds=1)
+    def run(self) -> dict:
+        simulation_engine = global_config.get("simulation_engine", "tick")
+        if (
+            simulation_engine != "event"
+            and global_config.get("arrival_process", "uniform") != "uniform"
+        ):
+            # the tick engines route at second boundaries, so arrivals within a
+            # second would wait for the next one
+            raise NotImplementedError(
+                "only the event engine routes arrivals within a second"
+            )
+        telemetry_dir = global_config.get("telemetry_dir", None)
+        if telemetry_dir is not None:
+            self.__telemetry = TelemetryRecorder(
+                output_dir=telemetry_dir,
+                invoker_number=len(self.__invokers),
+                flush_seconds=global_config.get("telemetry_flush_seconds", 3600),
+            )
+        # the profiler patches the hot methods only for this run
+        profiler = Profiler() if global_config.get("profiling", False) else None
+        with profiler if profiler is not None else contextlib.nullcontext():
+            match simulation_engine:
+                case "event":
+                    self.__run_event_driven()
+                case "tick":
+                    self.__run_tick()
+                case "sharded":
+                    # the tick engine with the invokers run by worker processes
+                    with ShardedInvokerFleet(
+                        invokers=self.__invokers,
+                        workload=self.__workload,
+                        shard_number=global_config.get("shard_number", os.cpu_count()),
+                    ) as fleet:
+                        self.__run_tick(run_invokers=fleet.run)
+                case _:
+                    raise NotImplementedError()
+        if self.__telemetry is not None:
+            self.__telemetry.flush()
+            print("save telemetry to", self.__telemetry.output_dir)
+            self.__telemetry = None
+        # the sketches of the invokers merge into the cluster wide ones
+        metrics = MetricsRecorder()
+        for invoker in self.__invokers:
+            metrics.merge(invoker.metrics)
+        result = metrics.total.summary()
+        print("total_slowdown size", result["invocation_number"])
+        print("slowdown mean is", result["slowdown_mean"])
+        print("90 quantile slowdown is", result["slowdown_p90"])
+        print("max slowdown is", result["slowdown_max"])
+        for cache_level, level_metrics in sorted(metrics.cache_levels.items()):
+            level_result = level_metrics.summary()
+            print(
+                "cache level",
+                cache_level,
+                "invocations",
+                level_result["invocation_number"],
+                "slowdown p50/p99",
+                level_result["slowdown_p50"],
+                level_result["slowdown_p99"],
+                "latency p50/p99",
+                level_result["latency_p50"],
+                level_result["latency_p99"],
+            )
+        if profiler is not None:
+            profiler.print_breakdown()
+        return result
+
+    def __run_invokers(self, time_duration: int) -> None:
+        for invoker in self.__invokers:
+            invoker.run(time_duration=time_duration)
+
+    def __run_tick(self, run_invokers: Callable | None = None):
+        if run_invokers is None:
+            run_invokers = self.__run_invokers
+        time_duration = TICKS_PER_SECOND
         simulation_minutes = global_config["simulation_minutes"]
-        while self.__global_clock.elapsed_minutes < simulation_minutes:
-            # split invocation per-second
-            print("time ", self.__global_clock.elapsed_minutes)
-            cur_minute = self.__global_clock.elapsed_minutes
-            invocations = self.__workload.generate_invocations(
-                cur_minute=int(cur_minute * simulation_minutes / (24 * 60))
+        arrivals = self.__workload.stream_arrivals(
+            simulation_minutes=simulation_minutes
+        )
+        batch = next(arrivals, None)
+        # arrivals of the last second are only due at the tick after it
+        while (
+            self.__global_clock.elapsed_minutes < simulation_minutes
+            or batch is not None
+        ):
+            if self.__global_clock.ticks % TICKS_PER_MINUTE == 0:
+                print("time ", self.__global_clock.elapsed_minutes)
+            if self.__telemetry is not None:
+                self.__record_telemetry(self.__global_clock.ticks // TICKS_PER_SECOND)
+            while (
+                batch is not None
+                and batch.arrival_times[-1] <= self.__global_clock.ticks
+            ):
+                self.__controller.route_batch(
+                    invocations=batch,
+                    invokers=self.__invokers,
+                    clock=self.__global_clock,
+                )
+                batch = next(arrivals, None)
+            # retry the queued invocations in seconds without arrivals
+            self.__controller.route_batch(
+                invocations=[], invokers=self.__invokers, clock=self.__global_clock
             )
-            batch_size = len(invocations) // 60
-            for i in range(60):
-                if i + 1 < 60:
-                    batch = invocations[:batch_size]
-                    invocations = invocations[batch_size:]
-                else:
-                    batch = invocations
-                assert batch
-                for invocation in batch:
-                    invocation.invoke_time = self.__global_clock.time_point
-                    self.__controller.queue_invocation(invocation)
-                while self.__controller.route_invocation(
-                    invokers=self.__invokers, clock=self.__global_clock
-                ):
-                    pass
-                for invoker in self.__invokers:
-                    invoker.run(time_duration=time_duration)
-                self.__global_clock.advance(amount=time_duration)
-                self.sync_clock()
+            run_invokers(time_duration=time_duration)
+            self.__global_clock.advance(amount=time_duration)
+            self.sync_clock()
 
         # deliver remaining invocations
         while self.__controller.has_invocation() or any(
             invoker.has_job() for invoker in self.__invokers
         ):
-            while self.__controller.route_invocation(
-                invokers=self.__invokers, clock=self.__global_clock
-            ):
-                pass
-            for invoker in self.__invokers:
-                invoker.run(time_duration=time_duration)
+            if self.__telemetry is not None:
+                self.__record_telemetry(self.__global_clock.ticks // TICKS_PER_SECOND)
+            self.__controller.route_batch(
+                invocations=[], invokers=self.__invokers, clock=self.__global_clock
+            )
+            run_invokers(time_duration=time_duration)
             self.__global_clock.advance(amount=time_duration)
             self.sync_clock()
-        total_slowdown = []
+
+    def __run_event_driven(self) -> None:
+        simulation_minutes = global_config["simulation_minutes"]
+        events = EventQueue()
+        wakeups: list[None | int] = [None] * len(self.__invokers)
+        dirty_invokers: set[int] = set()
+        for idx, invoker in enumerate(self.__invokers):
+            invoker.set_new_job_callback(functools.partial(dirty_invokers.add, idx))
+
+        def schedule_wakeup(idx: int) -> None:
+            wakeup = self.__invokers[idx].next_event_time()
+            if wakeup is None:
+                wakeups[idx] = None
+                return
+            if wakeups[idx] is not None and wakeups[idx] <= wakeup:
+                return
+            wakeups[idx] = wakeup
+            events.push(time_point=wakeup, event_type=EventType.INVOKER, payload=idx)
+
+        def wake_up(idx: int, time_point: int) -> bool:
+            # stale wakeup superseded by an earlier one
+            if wakeups[idx] != time_point:
+                return False
+            wakeups[idx] = None
+            invoker = self.__invokers[idx]
+            job_number = invoker.job_number
+            invoker.advance_to(global_clock=self.__global_clock)
+            schedule_wakeup(idx)
+            return invoker.job_number < job_number
+
+        def route(invocations: list) -> None:
+            self.__controller.route_batch(
+                invocations=invocations,
+                invokers=self.__invokers,
+                clock=self.__global_clock,
+            )
+            for idx in dirty_invokers:
+                schedule_wakeup(idx)
+            dirty_invokers.clear()
+
+        arrivals = self.__workload.stream_arrivals(
+            simulation_minutes=simulation_minutes
+        )
+
+        def push_arrival() -> None:
+            # only the next arrival batch is pending in the event queue
+            batch = next(arrivals, None)
+            if batch is not None:
+                events.push(
+                    time_point=int(batch.arrival_times[0]),
+                    event_type=EventType.ARRIVAL,
+                    payload=batch,
+                )
+
+        push_arrival()
+        cur_minute = None
+        # the state at a second is sampled before the events of that second
+        next_sample = 0
+        while events:
+            time_point, event_type, payload = events.pop()
+            while self.__telemetry is not None and next_sample <= time_point:
+                self.__record_telemetry(next_sample // TICKS_PER_SECOND)
+                next_sample += TICKS_PER_SECOND
+            self.__global_clock.set_ticks(time_point)
+            match event_type:
+                case EventType.ARRIVAL:
+                    if self.__global_clock.elapsed_minutes != cur_minute:
+                        cur_minute = self.__global_clock.elapsed_minutes
+                        print("time ", cur_minute)
+                    # arrivals of a batch are sorted, route those due now
+                    arrived, pending = payload.split([time_point + 1])
+                    route(arrived)
+                    if len(pending):
+                        events.push(
+                            time_point=int(pending.arrival_times[0]),
+                            event_type=EventType.ARRIVAL,
+                            payload=pending,
+                        )
+                    else:
+                        push_arrival()
+                case EventType.INVOKER:
+                    # apply all invoker events of this time point, so that the
+                    # queue is routed once against the updated cluster state
+                    released = wake_up(payload, time_point)
+                    while events and events.peek() == (time_point, EventType.INVOKER):
+                        released |= wake_up(events.pop()[2], time_point)
+                    # finished jobs release memory for the queued invocations, unlike
+                    # the tick engine this retries the queue within the second
+                    if released and self.__controller.has_invocation():
+                        route([])
         for invoker in self.__invokers:
-            total_slowdown += invoker.slowdown
-        print("total_slowdown size", len(total_slowdown))
-        print("slowdown mean is", np.mean(total_slowdown))
-        # print("slowdown std is", np.std(total_slowdown))
-        print("90 quantile slowdown is", np.quantile(total_slowdown, 0.9))
-        print("max slowdown is", np.max(total_slowdown))
+            invoker.set_new_job_callback(None)
+        if self.__controller.has_invocation():
+            raise RuntimeError("invocations can't fit into any invoker")
 
     def sync_clock(self):
         for invoker in self.__invokers:
@@ -89,6 +291,9 @@ class Simulator:
 
 
 if __name__ == "__main__":
+    # only the script needs the reproducible random environment
+    from cyy_naive_lib.reproducible_random_env import ReproducibleRandomEnv
+
     load_config()
     random_seed_dir = global_config.get("random_seed_dir", None)
     if random_seed_dir is None:
@@ -0,0 +1,87 @@
+import concurrent.futures
+import contextlib
+import copy
+import itertools
+import multiprocessing
+import os
+import random
+
+import numpy as np
+import pandas as pd
+
+from config import global_config, load_config
+from simulator import Simulator, get_workload
+from workload import Workload
+
+# keys read while building the workload can't vary inside a sweep
+workload_keys = {"workload", "application_number", "azure_trace_dir"}
+
+# set before the pool forks, so that workers share the workload pages
+_base_config: dict = {}
+_workload: Workload | None = None
+
+
+def __set_config(config: dict, key: str, value) -> None:
+    # dotted keys override nested values such as invoker.number
+    *parents, name = key.split(".")
+    for parent in parents:
+        config = config[parent]
+    config[name] = value
+
+
+def __run_point(task: tuple[dict, int]) -> dict:
+    overrides, seed = task
+    global_config.clear()
+    global_config.update(copy.deepcopy(_base_config))
+    for key, value in overrides.items():
+        __set_config(global_config, key, value)
+    random.seed(seed)
+    np.random.seed(seed)
+    with open(os.devnull, "w", encoding="utf-8") as devnull:
+        with contextlib.redirect_stdout(devnull):
+            result = Simulator(workload=_workload).run()
+    return overrides | {"seed": seed} | result
+
+
+def run_sweep(sweep_config: dict) -> pd.DataFrame:
+    global _base_config
+    global _workload
+    grid: dict = dict(sweep_config["grid"])
+    for key in grid:
+        if key.split(".")[0] in workload_keys:
+            raise RuntimeError("the shared workload can't be swept", key)
+    seeds = sweep_config.get("seeds", 1)
+    if isinstance(seeds, int):
+        seeds = list(range(seeds))
+    tasks = [
+        (dict(zip(grid.keys(), values)), seed)
+        for values in itertools.product(*grid.values())
+        for seed in seeds
+    ]
+
+    _base_config = copy.deepcopy(dict(global_config))
+    random.seed(sweep_config.get("workload_seed", 0))
+    np.random.seed(sweep_config.get("workload_seed", 0))
+    _workload = get_workload(global_config.get("workload", "azure"))
+    print("sweep", len(tasks), "simulations")
+    with concurrent.futures.ProcessPoolExecutor(
+        max_workers=sweep_config.get("workers", None),
+        mp_context=multiprocessing.get_context("fork"),
+    ) as executor:
+        results = list(executor.map(__run_point, tasks))
+    global_config.clear()
+    global_config.update(_base_config)
+    return pd.DataFrame(data=results)
+
+
+if __name__ == "__main__":
+    load_config()
+    sweep_config = global_config["sweep"]
+    df = run_sweep(sweep_config)
+    output = sweep_config.get("output", None)
+    if output is not None:
+        df.to_csv(output, index=False)
+        print("save results to", output)
+    summary = df.drop(columns=["seed"]).groupby(list(sweep_config["grid"].keys()))
+    with pd.option_context("display.max_rows", None, "display.width", None):
+        print(summary.mean())
@@ -0,0 +1,85 @@
+import glob
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from cluster_state import ClusterState
+
+cache_level_number = 4
+
+
+class TelemetryRecorder:
+    def __init__(self, output_dir: str, invoker_number: int, flush_seconds: int):
+        # one row per simulated second in preallocated columns, written out as a
+        # compressed chunk whenever the columns are full, the per invoker columns
+        # use 32 bits, which holds memory in MB
+        assert flush_seconds > 0
+        # every run writes into a new subdirectory, so runs sharing output_dir
+        # never overwrite or delete each other's chunks
+        os.makedirs(output_dir, exist_ok=True)
+        self.__output_dir = tempfile.mkdtemp(
+            prefix=time.strftime("run_%Y%m%d_%H%M%S_"), dir=output_dir
+        )
+        self.__capacity = flush_seconds
+        self.__size: int = 0
+        self.__columns: dict[str, np.ndarray] = {
+            "seconds": np.zeros(flush_seconds, dtype=np.int64),
+            "queue_length": np.zeros(flush_seconds, dtype=np.int64),
+            "dispatches": np.zeros((flush_seconds, cache_level_number), dtype=np.int64),
+            "job_numbers": np.zeros((flush_seconds, invoker_number), dtype=np.int32),
+            "free_memory": np.zeros((flush_seconds, invoker_number), dtype=np.int32),
+            "cached_memory": np.zeros((flush_seconds, invoker_number), dtype=np.int32),
+            "cached_containers": np.zeros(
+                (flush_seconds, invoker_number), dtype=np.int32
+            ),
+        }
+
+    @property
+    def output_dir(self) -> str:
+        return self.__output_dir
+
+    def record(
+        self,
+        second: int,
+        queue_length: int,
+        dispatches: list[int],
+        cluster_state: ClusterState,
+    ) -> None:
+        row = self.__size
+        columns = self.__columns
+        columns["seconds"][row] = second
+        columns["queue_length"][row] = queue_length
+        columns["dispatches"][row] = dispatches
+        columns["job_numbers"][row] = cluster_state.job_numbers
+        columns["free_memory"][row] = cluster_state.free_memory
+        columns["cached_memory"][row] = cluster_state.cached_memory
+        columns["cached_containers"][row] = cluster_state.cached_containers
+        self.__size += 1
+        if self.__size == self.__capacity:
+            self.flush()
+
+    def flush(self) -> None:
+        if not self.__size:
+            return
+        first_second = int(self.__columns["seconds"][0])
+        np.savez_compressed(
+            os.path.join(self.__output_dir, f"telemetry_{first_second:09d}.npz"),
+            **{name: column[: self.__size] for name, column in self.__columns.items()},
+        )
+        self.__size = 0
+
+
+def load_telemetry(output_dir: str) -> dict[str, np.ndarray]:
+    # output_dir is the directory of one run, the chunk names sort by their first
+    # second
+    chunks: list = []
+    for path in sorted(glob.glob(os.path.join(output_dir, "telemetry_*.npz"))):
+        with np.load(path) as chunk:
+            chunks.append(dict(chunk))
+    if not chunks:
+        return {}
+    return {
+        name: np.concatenate([chunk[name] for chunk in chunks]) for name in chunks[0]
+    }
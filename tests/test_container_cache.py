@@ -0,0 +1,54 @@
+import random
+from datetime import timedelta
+
+from clock import VirtualClock
+from container_cache import ContainerCache
+from simulated_concept import (Container, Invocation, SimulatedApplication,
+                               SimulatedFunction)
+
+
+def linear_lookup(
+    containers: list[Container], invocation: Invocation
+) -> tuple[Container | None, int]:
+    # the scan over the cached containers that the index replaced
+    for container in containers:
+        if container.fun_id == invocation.fun.id:
+            return container, 0
+    for container in containers:
+        if container.app_id == invocation.app.id:
+            return container, 1
+    fitting_containers = [
+        container for container in containers if container.memory >= invocation.memory
+    ]
+    if fitting_containers:
+        return min(fitting_containers, key=lambda container: container.memory), 2
+    return None, 3
+
+
+def test_lookup_matches_linear_scan():
+    random.seed(0)
+    applications = []
+    for _ in range(100):
+        # few distinct sizes, so that best-fit lookups have ties
+        applications.append(SimulatedApplication(memory=random.choice([128, 256, 512])))
+        for _ in range(random.randint(1, 3)):
+            applications[-1].add_fun(
+                SimulatedFunction(exec_time=timedelta(milliseconds=10))
+            )
+    clock = VirtualClock()
+    cache = ContainerCache()
+    for _ in range(2000):
+        if cache and random.random() < 0.4:
+            cache.remove(random.choice(list(cache)))
+        else:
+            app = random.choice(applications)
+            cache.add(
+                Container(
+                    invocation=Invocation(fun=random.choice(app.functions), app=app),
+                    clock=clock,
+                )
+            )
+        app = random.choice(applications)
+        invocation = Invocation(fun=random.choice(app.functions), app=app)
+        assert cache.lookup(invocation) == linear_lookup(list(cache), invocation)
+    assert cache.memory == sum(container.memory for container in cache)
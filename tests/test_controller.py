@@ -0,0 +1,38 @@
+from datetime import timedelta
+
+from clock import VirtualClock
+from config import global_config
+from controller import CacheAwareController
+from invoker import CacheInvoker
+from simulated_concept import Invocation, SimulatedApplication, SimulatedFunction
+
+
+def test_keep_alive_expiry_at_routing_tick(monkeypatch):
+    monkeypatch.setitem(global_config, "scheduler_type", "FIFO")
+    monkeypatch.setitem(global_config, "cache_policy", "KeepAlive")
+    # a keep-alive window of three seconds
+    monkeypatch.setitem(global_config, "keep_alive_minutes", 0.05)
+    app = SimulatedApplication(memory=128)
+    app.add_fun(SimulatedFunction(exec_time=timedelta(milliseconds=100)))
+    invokers = [CacheInvoker(memory=1024, cores=1) for _ in range(2)]
+    controller = CacheAwareController()
+    controller.register_invokers(invokers=invokers)
+    clock = VirtualClock()
+
+    def invoke() -> Invocation:
+        invocation = Invocation(fun=app.functions[0], app=app)
+        invocation.invoke_time = clock.ticks
+        controller.route_batch(invocations=[invocation], invokers=invokers, clock=clock)
+        return invocation
+
+    invoke()
+    clock.set_ticks(invokers[0].next_event_time())
+    invokers[0].advance_to(global_clock=clock)
+    assert len(invokers[0].cache) == 1
+    assert controller.cluster_state.warm_functions == {app.functions[0].id: {0}}
+    # route at the expiry tick before the invoker has caught up with the clock
+    clock.set_ticks(invokers[0].next_event_time())
+    invocation = invoke()
+    assert invocation.cache_level == 3
+    assert not invokers[0].cache
+    assert not controller.cluster_state.warm_functions
@@ -0,0 +1,68 @@
+import random
+from datetime import timedelta
+
+import numpy as np
+import pytest
+
+from clock import TICKS_PER_SECOND, VirtualClock
+from config import global_config
+from invoker import Invoker
+from job_scheduler import LotterySRTFScheduler
+from simulated_concept import Invocation, SimulatedApplication, SimulatedFunction
+
+scheduler_names = ["FIFO", "RR", "LAS", "SRTF", "LotterySRTF"]
+
+
+class TimeSliceInvoker(Invoker):
+    # runs the scheduler every time slice, as before the fast-forward
+    def next_state_change(self) -> int:
+        return self.time_slice
+
+
+def run_jobs(invoker_cls: type, arrivals: list[list[SimulatedFunction]]) -> tuple:
+    # two invokers run like in the tick engine, the LotterySRTF knowledge is shared
+    LotterySRTFScheduler.known_job_IDs.clear()
+    np.random.seed(0)
+    app = SimulatedApplication(memory=1)
+    invokers = [invoker_cls(memory=2**20, cores=2) for _ in range(2)]
+    clock = VirtualClock()
+    invocations = []
+    for second, functions in enumerate(arrivals):
+        for idx, fun in enumerate(functions):
+            invocation = Invocation(fun=fun, app=app)
+            invocation.invoke_time = clock.ticks
+            invokers[idx % 2].add_new_job(invocation=invocation, clock=clock)
+            invocations.append(invocation)
+        while True:
+            for invoker in invokers:
+                invoker.run(time_duration=TICKS_PER_SECOND)
+            clock.advance(TICKS_PER_SECOND)
+            for invoker in invokers:
+                invoker.sync_local_clock(global_clock=clock)
+            if second + 1 < len(arrivals) or not any(
+                invoker.has_job() for invoker in invokers
+            ):
+                break
+    return (
+        [invocation.finish_time for invocation in invocations],
+        sorted(LotterySRTFScheduler.known_job_IDs),
+        np.random.randint(2**32),
+    )
+
+
+@pytest.mark.parametrize("scheduler_type", scheduler_names)
+def test_fast_forward_equals_time_slices(monkeypatch, scheduler_type):
+    monkeypatch.setitem(global_config, "scheduler_type", scheduler_type)
+    random.seed(0)
+    functions = [
+        SimulatedFunction(exec_time=timedelta(milliseconds=exec_time))
+        for exec_time in (3, 17, 120, 450, 1300)
+    ]
+    # bursts that exceed the cores alternate with quiet seconds
+    arrivals = [
+        random.choices(functions, k=random.choice([0, 1, 2, 6, 12]))
+        for _ in range(20)
+    ]
+    result = run_jobs(Invoker, arrivals)
+    assert all(finish_time is not None for finish_time in result[0])
+    assert result == run_jobs(TimeSliceInvoker, arrivals)
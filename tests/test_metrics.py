@@ -0,0 +1,65 @@
+import math
+
+import numpy as np
+
+from metrics import LogHistogram, quantiles
+
+
+def exact_quantile(values: list[float], q: float) -> float:
+    # the sketch ranks a quantile at q * (count - 1)
+    return sorted(values)[math.floor(q * (len(values) - 1))]
+
+
+def sample_values(seed: int, size: int) -> list[float]:
+    values = np.random.default_rng(seed).lognormal(0, 2, size=size).tolist()
+    # non-positive values are counted apart from the logarithmic bins
+    return values + [0.0] * (size // 100)
+
+
+def check_quantiles(sketch: LogHistogram, values: list[float], qs) -> None:
+    for q in qs:
+        exact = exact_quantile(values, q)
+        error = abs(sketch.quantile(q) - exact)
+        assert error <= sketch.relative_accuracy * exact + 1e-12
+
+
+def test_quantiles_within_relative_accuracy():
+    values = sample_values(seed=0, size=10000)
+    sketch = LogHistogram()
+    for value in values:
+        sketch.add(value)
+    assert len(sketch) == len(values)
+    assert sketch.min == min(values)
+    assert sketch.max == max(values)
+    assert math.isclose(sketch.mean, sum(values) / len(values))
+    check_quantiles(sketch, values, [0, 0.001, 0.01, 0.25] + list(quantiles.values()))
+    assert sketch.quantile(1) == max(values)
+
+
+def test_merge_equals_single_sketch():
+    parts = [sample_values(seed=seed, size=3000) for seed in range(4)]
+    merged = LogHistogram()
+    single = LogHistogram()
+    for part in parts:
+        sketch = LogHistogram()
+        for value in part:
+            sketch.add(value)
+            single.add(value)
+        merged.merge(sketch)
+    values = [value for part in parts for value in part]
+    assert len(merged) == len(values)
+    assert merged.min == single.min and merged.max == single.max
+    assert math.isclose(merged.mean, single.mean)
+    for q in [0, 0.01, 0.5, 0.9, 0.99, 0.999, 1]:
+        assert merged.quantile(q) == single.quantile(q)
+    check_quantiles(merged, values, quantiles.values())
+
+
+def test_collapse_keeps_upper_quantiles():
+    # the lowest bins are merged once there are more than max_bin_number of them
+    values = np.random.default_rng(0).lognormal(0, 3, size=10000).tolist()
+    sketch = LogHistogram(max_bin_number=256)
+    for value in values:
+        sketch.add(value)
+    check_quantiles(sketch, values, [0.9, 0.99, 0.999])
+    assert exact_quantile(values, 0.01) < sketch.quantile(0.01)
@@ -0,0 +1,75 @@
+import random
+
+import numpy as np
+import pytest
+
+from config import global_config
+from simulator import Simulator
+
+scheduler_names = ["FIFO", "RR", "LAS", "SRTF", "LotterySRTF"]
+
+
+def simulate(monkeypatch, **config) -> dict:
+    for key, value in (
+        dict(
+            workload="synthetic",
+            controller_type="cacheaware",
+            scheduler_type="FIFO",
+            cache_policy="LRU",
+            keep_alive_minutes=1,
+            arrival_process="uniform",
+            application_number=20,
+            application_invocation_limit=500,
+            simulation_minutes=2,
+            invoker=dict(number=6, core=2, memory=2),
+        )
+        | config
+    ).items():
+        monkeypatch.setitem(global_config, key, value)
+    random.seed(0)
+    np.random.seed(0)
+    return Simulator().run()
+
+
+@pytest.mark.parametrize("scheduler_type", scheduler_names)
+@pytest.mark.parametrize("controller_type", ["leastload", "cacheaware"])
+def test_sharded_equals_tick(monkeypatch, controller_type, scheduler_type):
+    # the invocations queue, so LotterySRTF draws its lottery
+    config = dict(controller_type=controller_type, scheduler_type=scheduler_type)
+    result = simulate(monkeypatch, simulation_engine="tick", **config)
+    assert result["invocation_number"]
+    for shard_number in (1, 3):
+        assert result == simulate(
+            monkeypatch,
+            simulation_engine="sharded",
+            shard_number=shard_number,
+            **config,
+        )
+
+
+@pytest.mark.parametrize("simulation_engine", ["tick", "sharded"])
+def test_tick_engines_reject_poisson_arrivals(monkeypatch, simulation_engine):
+    with pytest.raises(NotImplementedError):
+        simulate(
+            monkeypatch,
+            simulation_engine=simulation_engine,
+            arrival_process="poisson",
+        )
+
+
+@pytest.mark.parametrize("scheduler_type", ["FIFO", "RR", "LAS", "SRTF"])
+@pytest.mark.parametrize("controller_type", ["leastload", "cacheaware"])
+def test_event_equals_tick_without_queueing(
+    monkeypatch, controller_type, scheduler_type
+):
+    # enough invokers that no invocation waits in the controller queue
+    config = dict(
+        controller_type=controller_type,
+        scheduler_type=scheduler_type,
+        cache_policy="KeepAlive",
+        invoker=dict(number=40, core=4, memory=8),
+        application_invocation_limit=300,
+    )
+    result = simulate(monkeypatch, simulation_engine="tick", **config)
+    assert result["invocation_number"]
+    assert result == simulate(monkeypatch, simulation_engine="event", **config)
@@ -0,0 +1,80 @@
+import random
+
+import pytest
+
+from timer_wheel import TimerWheel
+
+
+def test_cascade_across_levels():
+    # four slots per level, so level 1 spans 16 ticks and level 2 spans 64 ticks
+    wheel = TimerWheel(resolution=1, slot_number=4, level_number=3)
+    wheel.schedule(key="near", deadline=2)
+    wheel.schedule(key="middle", deadline=9)
+    wheel.schedule(key="far", deadline=50)
+    assert len(wheel) == 3
+    assert wheel.next_deadline() == 2
+    assert wheel.advance(1) == []
+    assert wheel.advance(2) == ["near"]
+    assert wheel.next_deadline() == 9
+    assert wheel.advance(8) == []
+    assert wheel.advance(9) == ["middle"]
+    assert wheel.next_deadline() == 50
+    assert wheel.advance(49) == []
+    assert wheel.advance(50) == ["far"]
+    assert not wheel
+    assert wheel.next_deadline() is None
+    with pytest.raises(RuntimeError):
+        wheel.schedule(key="beyond", deadline=50 + 64)
+
+
+def test_cancelled_timers_do_not_fire():
+    wheel = TimerWheel(resolution=1, slot_number=4, level_number=3)
+    wheel.schedule(key="cancelled", deadline=5)
+    wheel.schedule(key="far", deadline=40)
+    wheel.cancel("cancelled")
+    assert len(wheel) == 1
+    assert wheel.next_deadline() == 40
+    assert wheel.advance(39) == []
+    # a cancelled key can be scheduled again
+    wheel.schedule(key="cancelled", deadline=45)
+    wheel.cancel("far")
+    assert wheel.next_deadline() == 45
+    assert wheel.advance(50) == ["cancelled"]
+    assert not wheel
+    assert wheel.next_deadline() is None
+
+
+def test_timers_fire_at_their_deadline():
+    random.seed(0)
+    resolution = 10
+    wheel = TimerWheel(resolution=resolution, slot_number=4, level_number=3)
+    pending: dict[int, int] = {}
+    timer_number = 0
+    time_point = 0
+    for _ in range(3000):
+        # cancel a few timers, as the keep-alive policy does on reuse
+        for timer in random.sample(sorted(pending), min(len(pending), 2)):
+            if random.random() < 0.3:
+                wheel.cancel(timer)
+                pending.pop(timer)
+        for _ in range(random.randint(0, 3)):
+            deadline = time_point + random.randint(0, 60 * resolution)
+            wheel.schedule(key=timer_number, deadline=deadline)
+            # deadlines are rounded up to the resolution
+            pending[timer_number] = -(-deadline // resolution) * resolution
+            timer_number += 1
+        if pending:
+            assert wheel.next_deadline() == min(pending.values())
+        # mostly small steps, sometimes a jump over several level 1 slots
+        time_point += random.choice(
+            [random.randint(1, 2 * resolution), random.randint(1, 40 * resolution)]
+        )
+        expected = {
+            timer
+            for timer, fire_time in pending.items()
+            if fire_time <= time_point // resolution * resolution
+        }
+        assert set(wheel.advance(time_point)) == expected
+        for timer in expected:
+            pending.pop(timer)
+        assert len(wheel) == len(pending)
@@ -0,0 +1,35 @@
+import random
+
+import numpy as np
+
+from config import global_config
+from dataset.synthetic_workload import (SyntheticWorkload,
+                                        load_workload_parameters)
+
+
+def first_minute_arrivals(monkeypatch, arrival_process: str) -> tuple[int, int]:
+    monkeypatch.setitem(global_config, "arrival_process", arrival_process)
+    monkeypatch.setitem(global_config, "application_number", 20)
+    monkeypatch.setitem(global_config, "application_invocation_limit", 20000)
+    parameters = load_workload_parameters()
+    # a day curve rising from 100 to 1539 invocations, 819.5 on average
+    parameters["invocation"]["coefficients"] = [1, 100]
+    random.seed(0)
+    np.random.seed(0)
+    workload = SyntheticWorkload(parameters=parameters)
+    # with a simulated day, simulated minutes are the minutes of the curve
+    arrival_number = 0
+    for batch in workload.stream_arrivals(simulation_minutes=24 * 60):
+        if batch.arrival_times[0] >= 60 * 1000000:
+            break
+        arrival_number += len(batch)
+    return arrival_number, len(workload.functions)
+
+
+def test_poisson_arrivals_follow_the_invocation_curve(monkeypatch):
+    # uniform arrivals keep application_invocation_limit in every minute
+    arrival_number, function_number = first_minute_arrivals(monkeypatch, "uniform")
+    assert arrival_number == round(20000 / function_number) * function_number
+    arrival_number, _ = first_minute_arrivals(monkeypatch, "poisson")
+    expected = 20000 * 100 / 819.5
+    assert abs(arrival_number - expected) < 0.1 * expected
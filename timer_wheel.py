@@ -0,0 +1,135 @@
+from typing import Any
+
+
+class TimerWheel:
+    def __init__(self, resolution: int, slot_number: int = 64, level_number: int = 4):
+        # level l has slot_number slots, each spanning resolution * slot_number**l ticks
+        self.__resolution = resolution
+        self.__slot_number = slot_number
+        self.__levels: list[list[list[tuple[int, Any]]]] = [
+            [[] for _ in range(slot_number)] for _ in range(level_number)
+        ]
+        # entries per level, including cancelled ones not dropped yet
+        self.__level_sizes: list[int] = [0] * level_number
+        self.__ready: list[tuple[int, Any]] = []
+        self.__current: int = 0
+        # the firing tick of each live timer, cancelled timers leave their entries
+        # in the slots and are dropped when they cascade or fire
+        self.__timers: dict[Any, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.__timers)
+
+    def schedule(self, key: Any, deadline: int) -> None:
+        assert key not in self.__timers
+        # round up so that a timer never fires before its deadline
+        tick = -(-deadline // self.__resolution)
+        self.__timers[key] = tick
+        self.__insert(tick, key)
+
+    def cancel(self, key: Any) -> None:
+        self.__timers.pop(key)
+
+    def next_deadline(self) -> int | None:
+        if not self.__timers:
+            return None
+        if any(self.__is_live(entry) for entry in self.__ready):
+            return self.__current * self.__resolution
+        # slots of a level are in time order from the one after the current slot,
+        # the earliest timer is the earliest of the first live slot of each level
+        next_tick = None
+        span = 1
+        for level, slots in enumerate(self.__levels):
+            if self.__level_sizes[level]:
+                current_slot = self.__current // span
+                for slot_idx in range(current_slot + 1, current_slot + 1 + len(slots)):
+                    ticks = [
+                        entry[0]
+                        for entry in slots[slot_idx % len(slots)]
+                        if self.__is_live(entry)
+                    ]
+                    if ticks:
+                        if next_tick is None or min(ticks) < next_tick:
+                            next_tick = min(ticks)
+                        break
+            span *= self.__slot_number
+        assert next_tick is not None
+        return next_tick * self.__resolution
+
+    def advance(self, time_point: int) -> list[Any]:
+        target = time_point // self.__resolution
+        while self.__current < target:
+            if not self.__timers:
+                self.__current = target
+                self.__clear()
+                break
+            if not self.__level_sizes[0]:
+                # nothing can fire before the next cascade from level 1
+                boundary = (
+                    self.__current // self.__slot_number + 1
+                ) * self.__slot_number
+                if boundary > target:
+                    self.__current = target
+                    break
+                self.__current = boundary - 1
+            self.__step()
+        expired = []
+        for entry in self.__ready:
+            if self.__is_live(entry):
+                self.__timers.pop(entry[1])
+                expired.append(entry[1])
+        self.__ready = []
+        return expired
+
+    def __is_live(self, entry: tuple[int, Any]) -> bool:
+        return self.__timers.get(entry[1]) == entry[0]
+
+    def __clear(self) -> None:
+        # only cancelled entries are left
+        for level, slots in enumerate(self.__levels):
+            if self.__level_sizes[level]:
+                for slot in slots:
+                    slot.clear()
+                self.__level_sizes[level] = 0
+        self.__ready = []
+
+    def __step(self) -> None:
+        self.__current += 1
+        span = 1
+        cascaded_levels = 0
+        for level in range(1, len(self.__levels)):
+            span *= self.__slot_number
+            if self.__current % span:
+                break
+            cascaded_levels = level
+        for level in range(cascaded_levels, 0, -1):
+            slot_idx = (
+                self.__current // self.__slot_number**level
+            ) % self.__slot_number
+            slot = self.__levels[level][slot_idx]
+            self.__levels[level][slot_idx] = []
+            self.__level_sizes[level] -= len(slot)
+            for entry in slot:
+                if self.__is_live(entry):
+                    self.__insert(*entry)
+        slot_idx = self.__current % self.__slot_number
+        slot = self.__levels[0][slot_idx]
+        if slot:
+            self.__levels[0][slot_idx] = []
+            self.__level_sizes[0] -= len(slot)
+            self.__ready += slot
+
+    def __insert(self, tick: int, key: Any) -> None:
+        delta = tick - self.__current
+        if delta <= 0:
+            self.__ready.append((tick, key))
+            return
+        span = self.__slot_number
+        for level, slots in enumerate(self.__levels):
+            if delta < span:
+                slot_idx = (tick // (span // self.__slot_number)) % self.__slot_number
+                slots[slot_idx].append((tick, key))
+                self.__level_sizes[level] += 1
+                return
+            span *= self.__slot_number
+        raise RuntimeError("timer deadline is beyond the wheel range", tick)
@@ -0,0 +1,136 @@
+from typing import Iterator
+
+import numpy as np
+
+from clock import TICKS_PER_MINUTE, TICKS_PER_SECOND
+from config import global_config
+from invocation_batch import InvocationBatch
+from simulated_concept import SimulatedApplication, SimulatedFunction
+
+
+class Workload:
+    def __init__(self, applications: list[SimulatedApplication]):
+        assert applications
+        self.__applications = applications
+        # per-function columns from which invocation batches are gathered
+        self.__functions: list[SimulatedFunction] = []
+        fun_app_indices: list[int] = []
+        for app_idx, application in enumerate(applications):
+            for function in application.functions:
+                self.__functions.append(function)
+                fun_app_indices.append(app_idx)
+        self.__fun_app_indices = np.asarray(fun_app_indices, dtype=np.int64)
+        self.__fun_remain_times = np.asarray(
+            [function.total_cost for function in self.__functions], dtype=np.int64
+        )
+        self.__app_memories = np.asarray(
+            [application.memory for application in applications], dtype=np.int64
+        )
+
+    @property
+    def applications(self) -> list[SimulatedApplication]:
+        return self.__applications
+
+    @property
+    def functions(self) -> list[SimulatedFunction]:
+        return self.__functions
+
+    def _invocation_rates(self, minute: int, simulation_minutes: int) -> np.ndarray:
+        # expected invocations of each function in the given simulated minute
+        raise NotImplementedError()
+
+    def _arrival_intensity(self, minute: int, simulation_minutes: int) -> float:
+        # the Poisson rates of a minute relative to the invocation rates, for
+        # workloads whose rates don't follow their load over the day
+        return 1.0
+
+    def stream_arrivals(self, simulation_minutes: int) -> Iterator[InvocationBatch]:
+        # yield the arrivals of each second in order, only the per-function rates
+        # of the current minute and one second of invocations are held
+        arrival_process = global_config.get("arrival_process", "uniform")
+        for minute in range(simulation_minutes):
+            invocation_rates = self._invocation_rates(
+                minute=minute, simulation_minutes=simulation_minutes
+            )
+            match arrival_process:
+                case "uniform":
+                    batches = self.__uniform_arrivals(
+                        minute=minute, invocation_rates=invocation_rates
+                    )
+                case "poisson":
+                    batches = self.__poisson_arrivals(
+                        minute=minute,
+                        invocation_rates=invocation_rates
+                        * self._arrival_intensity(
+                            minute=minute, simulation_minutes=simulation_minutes
+                        ),
+                    )
+                case _:
+                    raise NotImplementedError(arrival_process)
+            yield from batches
+
+    def __uniform_arrivals(
+        self, minute: int, invocation_rates: np.ndarray
+    ) -> Iterator[InvocationBatch]:
+        # a fixed number of invocations per minute, all arrivals of a second
+        # share the start of that second
+        invocation_numbers = np.round(invocation_rates).astype(np.int64)
+        invocation_number = int(invocation_numbers.sum())
+        # drawing seconds without replacement from the minute is the same as
+        # shuffling the whole minute and cutting it into 60 pieces
+        rng = np.random.default_rng(np.random.randint(2**32))
+        for second in range(60):
+            count = (second + 1) * invocation_number // 60 - (
+                second * invocation_number // 60
+            )
+            if not count:
+                continue
+            drawn_numbers = rng.multivariate_hypergeometric(invocation_numbers, count)
+            invocation_numbers -= drawn_numbers
+            fun_indices = rng.permutation(
+                np.repeat(np.arange(len(self.__functions)), drawn_numbers)
+            )
+            yield self.__make_batch(
+                fun_indices=fun_indices,
+                arrival_times=np.full(
+                    count,
+                    minute * TICKS_PER_MINUTE + second * TICKS_PER_SECOND,
+                    dtype=np.int64,
+                ),
+            )
+
+    def __poisson_arrivals(
+        self, minute: int, invocation_rates: np.ndarray
+    ) -> Iterator[InvocationBatch]:
+        # independent Poisson processes per function, given the count of a second
+        # the arrival times are uniform order statistics
+        second_rates = invocation_rates / 60
+        for second in range(60):
+            drawn_numbers = np.random.poisson(second_rates)
+            count = int(drawn_numbers.sum())
+            if not count:
+                continue
+            fun_indices = np.random.permutation(
+                np.repeat(np.arange(len(self.__functions)), drawn_numbers)
+            )
+            arrival_times = np.sort(
+                np.random.randint(0, TICKS_PER_SECOND, size=count, dtype=np.int64)
+            )
+            arrival_times += minute * TICKS_PER_MINUTE + second * TICKS_PER_SECOND
+            yield self.__make_batch(
+                fun_indices=fun_indices, arrival_times=arrival_times
+            )
+
+    def __make_batch(
+        self, fun_indices: np.ndarray, arrival_times: np.ndarray
+    ) -> InvocationBatch:
+        app_indices = self.__fun_app_indices[fun_indices]
+        return InvocationBatch(
+            functions=self.__functions,
+            applications=self.__applications,
+            fun_indices=fun_indices,
+            app_indices=app_indices,
+            arrival_times=arrival_times,
+            remain_times=self.__fun_remain_times[fun_indices],
+            memories=self.__app_memories[app_indices],
+        )